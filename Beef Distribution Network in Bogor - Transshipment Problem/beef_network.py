@@ -0,0 +1,359 @@
+import hashlib
+import os
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pyomo.environ as pyo
+
+
+#Carbon emission per unit, fixed variable
+CE = 2.94
+
+# Columns every sheet of the case workbook must have
+CASE_SCHEMA = {
+    'origin_hub_tcost': ['path', 'origin', 'hub', 'cost_per_unit'],
+    'origin_hub_ccost': ['path', 'origin', 'hub', 'cost_per_unit'],
+    'hub_destination_tcost': ['path', 'hub', 'destination', 'cost'],
+    'hub_destination_ccost': ['path', 'hub', 'destination', 'cost'],
+    'origin_capacity': ['origin', 'capacity'],
+    'destination_demand': ['destination', 'demand'],
+    'hub_id': ['hub'],
+}
+
+# Anti-monopoly limits of the notebook's second model, as shares of total demand
+ANTI_MONOPOLY_SHARES = {
+    'max_supplier_share': 0.5,
+    'min_supplier_share': 0.05,
+    'max_hub_share': 0.5,
+    'min_hub_share': 0.01,
+}
+
+# Bump when the cached layout changes so old cache files are not read
+CACHE_VERSION = 1
+
+
+def _read_workbook(path):
+    # One streaming pass over every sheet; read-only mode yields cell values without building the cell tree
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        case = {}
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, ())
+            table = pd.DataFrame([row for row in rows if any(value is not None for value in row)], columns=header)
+            case[sheet.title] = table.loc[:, table.columns.notna()]
+    finally:
+        workbook.close()
+    return case
+
+
+def validate_case(case):
+    # Sheets, columns and numbering the model relies on; X and Y are indexed by row position, so paths must be 0..n-1 in order
+    for sheet, columns in CASE_SCHEMA.items():
+        if sheet not in case:
+            raise ValueError(f'Sheet {sheet!r} is missing from the case workbook')
+        table = case[sheet]
+        missing = [column for column in columns if column not in table.columns]
+        if missing:
+            raise ValueError(f'Sheet {sheet!r} is missing columns {missing}')
+        not_numeric = [column for column in columns if not pd.api.types.is_numeric_dtype(table[column])]
+        if not_numeric:
+            raise ValueError(f'Sheet {sheet!r} has non-numeric values in columns {not_numeric}')
+        if 'path' in columns and not np.array_equal(table['path'].to_numpy(), np.arange(len(table))):
+            raise ValueError(f'Sheet {sheet!r} must number its paths 0, 1, 2, ... in row order')
+    return case
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _save_npz(case, path):
+    # One array per sheet column, keyed 'sheet:column'; text columns are stored as str so no pickling is needed
+    arrays = {}
+    for sheet, table in case.items():
+        for column in table.columns:
+            values = table[column].to_numpy()
+            arrays[f'{sheet}:{column}'] = values.astype(str) if values.dtype == object else values
+    # Written under a temporary name first so a parallel run never reads a half-written file
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(temporary, path)
+
+
+def _load_npz(path):
+    case = {}
+    with np.load(path, allow_pickle=False) as data:
+        for key in data.files:
+            sheet, column = key.split(':', 1)
+            case.setdefault(sheet, {})[column] = data[key]
+    return {sheet: pd.DataFrame(columns) for sheet, columns in case.items()}
+
+
+def load_case(path='input_transportation_case.xlsx', cache_dir=None):
+    """Every input sheet in one pass, keyed by sheet name as in the notebook.
+
+    The workbook is streamed in read-only mode and checked against
+    CASE_SCHEMA. With cache_dir, the parsed tables are also stored there as
+    .npz named after the workbook's content hash: re-runs on an unchanged
+    workbook load the arrays and skip Excel parsing, and an edited workbook
+    hashes differently and is parsed again.
+    """
+    if cache_dir is None:
+        return validate_case(_read_workbook(path))
+
+    cached = os.path.join(cache_dir, f'case-v{CACHE_VERSION}-{_file_hash(path)}.npz')
+    if os.path.exists(cached):
+        return _load_npz(cached)
+
+    case = validate_case(_read_workbook(path))
+    os.makedirs(cache_dir, exist_ok=True)
+    _save_npz(case, cached)
+    return case
+
+
+def random_case(n_origins, n_hubs, n_destinations, seed=0, independent_carbon=False):
+    """Seeded synthetic network shaped like input_transportation_case.xlsx.
+
+    Every origin connects to every hub and every hub to every destination,
+    ids start at 1 and paths are numbered from 0, as in the case workbook.
+    Hub-to-destination costs are for serving a destination's whole demand.
+    Carbon costs are the transport costs times the workbook's constant
+    factors, so transport and carbon never conflict and the Pareto frontier
+    is a single point. With independent_carbon=True every path draws its own
+    carbon factor around those constants, which gives a frontier with
+    trade-offs (see beef_pareto); the transport costs stay the same.
+    """
+    rng = np.random.default_rng(seed)
+    origins = np.arange(1, n_origins + 1)
+    hubs = np.arange(1, n_hubs + 1)
+    destinations = np.arange(1, n_destinations + 1)
+
+    demand = rng.integers(14_000, 100_000, size=n_destinations)
+    capacity = (demand.sum() * rng.uniform(0.6, 1.0, size=n_origins)).astype(int)
+
+    o_h = pd.DataFrame({'origin': np.repeat(origins, n_hubs), 'hub': np.tile(hubs, n_origins)})
+    o_h.insert(0, 'path', np.arange(len(o_h)))
+    o_h_tcost = o_h.assign(cost_per_unit=np.round(rng.uniform(9, 50, size=len(o_h)), 2))
+    o_h_factor = 0.0453
+
+    h_d = pd.DataFrame({'hub': np.repeat(hubs, n_destinations), 'destination': np.tile(destinations, n_hubs)})
+    h_d.insert(0, 'path', np.arange(len(h_d)))
+    h_d_tcost = h_d.assign(cost=np.round(demand[h_d.destination - 1] * rng.uniform(6, 17, size=len(h_d)), 2))
+    h_d_factor = 0.0452
+
+    if independent_carbon:
+        # Own generator, so the transport costs match the case drawn with proportional carbon
+        carbon_rng = np.random.default_rng([seed, 1])
+        o_h_factor = o_h_factor * carbon_rng.uniform(0.2, 1.8, size=len(o_h))
+        h_d_factor = h_d_factor * carbon_rng.uniform(0.2, 1.8, size=len(h_d))
+    o_h_ccost = o_h.assign(cost_per_unit=np.round(o_h_tcost.cost_per_unit * o_h_factor, 2))
+    h_d_ccost = h_d.assign(cost=np.round(h_d_tcost.cost * h_d_factor, 2))
+
+    return {
+        'origin_hub_tcost': o_h_tcost,
+        'origin_hub_ccost': o_h_ccost,
+        'hub_destination_tcost': h_d_tcost,
+        'hub_destination_ccost': h_d_ccost,
+        'origin_capacity': pd.DataFrame({'origin': origins, 'capacity': capacity}),
+        'destination_demand': pd.DataFrame({'destination': destinations, 'demand': demand}),
+        'hub_id': pd.DataFrame({'hub': hubs}),
+    }
+
+
+def _paths_by(table, column):
+    # Path ids of a path table grouped by one endpoint column, in one groupby pass
+    return {node: list(paths) for node, paths in table.groupby(column, sort=False)['path']}
+
+
+class BeefNetwork:
+    """Adjacency of the transshipment network, built once from the case tables.
+
+    Maps every origin to its outgoing origin-hub paths, every hub to its
+    incoming origin-hub and outgoing hub-destination paths, every destination
+    to its incoming paths and every (hub, destination) to its path. The
+    constraint builders look paths up here instead of masking the full path
+    tables per node, so building the model is linear in the number of paths.
+    """
+
+    def __init__(self, case):
+        o_h_tcost = case['origin_hub_tcost']
+        h_d_tcost = case['hub_destination_tcost']
+        capacity = case['origin_capacity']
+        demand = case['destination_demand']
+
+        self.origins = list(capacity.origin)
+        self.hubs = list(case['hub_id'].hub)
+        self.destinations = list(demand.destination)
+        self.capacity = dict(zip(capacity.origin, capacity.capacity))
+        self.demand = dict(zip(demand.destination, demand.demand))
+        self.total_demand = sum(self.demand.values())
+
+        self.origin_paths = _paths_by(o_h_tcost, 'origin')
+        self.hub_in_paths = _paths_by(o_h_tcost, 'hub')
+        self.hub_out_paths = _paths_by(h_d_tcost, 'hub')
+        self.destination_paths = _paths_by(h_d_tcost, 'destination')
+        self.hub_destination_path = dict(zip(zip(h_d_tcost.hub, h_d_tcost.destination), h_d_tcost.path))
+
+        # Demand moved on a hub-destination path when it is chosen
+        self.path_demand = dict(zip(h_d_tcost.path, h_d_tcost.destination.map(self.demand)))
+
+
+def origin_supply(model, network):
+    # Amount each origin sends to the hubs, shared by origincap and the supplier anti-monopoly limits
+    return {origin: sum(model.X[path] for path in network.origin_paths.get(origin, []))
+            for origin in network.origins}
+
+
+def hub_throughput(model, network):
+    # Demand each hub serves, shared by noinventory and the hub anti-monopoly limits
+    return {hub: sum(model.Y[path] * network.path_demand[path] for path in network.hub_out_paths.get(hub, []))
+            for hub in network.hubs}
+
+
+def build_model(case, anti_monopoly=False, network=None):
+    """The transshipment model of the notebook, with the same component names.
+
+    X[path] is the integer amount sent on an origin-hub path and Y[path] = 1
+    when a hub serves a destination. anti_monopoly=True adds the supplier and
+    hub share constraints of the notebook's second model. Pass a BeefNetwork
+    to reuse one across several builds of the same case.
+    """
+    o_h_tcost = case['origin_hub_tcost']
+    o_h_ccost = case['origin_hub_ccost']
+    h_d_tcost = case['hub_destination_tcost']
+    h_d_ccost = case['hub_destination_ccost']
+    if network is None:
+        network = BeefNetwork(case)
+
+    #model
+    model = pyo.ConcreteModel()
+
+    # variable
+    # X(i,j)
+    model.X = pyo.Var(range(len(o_h_tcost)), within=pyo.Integers, bounds=(0, None))
+    X = model.X
+
+    # Y(j,k)
+    model.Y = pyo.Var(range(len(h_d_tcost)), within=pyo.Binary)
+    Y = model.Y
+
+    sent_from_origin = origin_supply(model, network)
+    served_by_hub = hub_throughput(model, network)
+
+    #Origin Supply Constraint
+    #What is being produced and delivered to hub should not exceed origin capacity
+    model.origincap = pyo.ConstraintList()
+    for origin_node in network.origins:
+        model.origincap.add(expr = sent_from_origin[origin_node] <= network.capacity[origin_node] )
+
+    #No inventory at hub constraint
+    #what has been sent to hub, all of them has to be delivered to destination(s)
+    model.noinventory = pyo.ConstraintList()
+    for hub_node in network.hubs:
+        total_sent_from_origin = sum(X[path] for path in network.hub_in_paths.get(hub_node, []))
+        model.noinventory.add(expr = total_sent_from_origin == served_by_hub[hub_node] )
+
+    # One destination satisfied by one hub constraint
+    model.singledist = pyo.ConstraintList()
+    for dest_node in network.destinations:
+        model.singledist.add(expr = sum(Y[hub_chosen] for hub_chosen in network.destination_paths.get(dest_node, [])) == 1)
+
+    #objective function
+    total_tcost_o_h = sum(X[ij] * cost for ij, cost in zip(o_h_tcost.path, o_h_tcost.cost_per_unit))
+    total_tcost_h_d = sum(Y[jk] * cost for jk, cost in zip(h_d_tcost.path, h_d_tcost.cost))
+    total_ccost_o_h = sum(X[ij] * cost for ij, cost in zip(o_h_ccost.path, o_h_ccost.cost_per_unit))
+    total_ccost_h_d = sum(Y[jk] * cost for jk, cost in zip(h_d_ccost.path, h_d_ccost.cost))
+
+    # Transport and carbon parts are kept as named expressions so other objectives can weigh them differently
+    model.transport_cost = pyo.Expression(expr = total_tcost_o_h + total_tcost_h_d)
+    model.carbon_cost = pyo.Expression(expr = total_ccost_o_h + total_ccost_h_d)
+    model.obj = pyo.Objective(expr = model.transport_cost + CE * model.carbon_cost, sense=pyo.minimize)
+
+    if anti_monopoly:
+        add_anti_monopoly(model, case, network)
+    return model
+
+
+def add_anti_monopoly(model, case, network=None):
+    # Supplier and hub share limits of the notebook's second model
+    if network is None:
+        network = BeefNetwork(case)
+    sent_from_origin = origin_supply(model, network)
+    served_by_hub = hub_throughput(model, network)
+
+    # The shares are mutable parameters, so other thresholds only need a re-solve, not a rebuild
+    for name, share in ANTI_MONOPOLY_SHARES.items():
+        model.add_component(name, pyo.Param(initialize=share, mutable=True, within=pyo.UnitInterval))
+
+    # Individual Supplier Anti-Monopoly Constraint, at most max_supplier_share (50%) of demand
+    model.maxantimonosup = pyo.ConstraintList()
+    for origin_node in network.origins:
+        model.maxantimonosup.add(expr= sent_from_origin[origin_node] <= model.max_supplier_share * network.total_demand)
+
+    # Each supplier must handle at least min_supplier_share (5%) of demand
+    model.minantimonosup = pyo.ConstraintList()
+    for origin_node in network.origins:
+        model.minantimonosup.add(expr= sent_from_origin[origin_node] >= model.min_supplier_share * network.total_demand)
+
+    # Individual Hub Anti-Monopoly Constraint, at most max_hub_share (50%) of demand
+    model.maxantimonohub = pyo.ConstraintList()
+    for hub_node in network.hubs:
+        model.maxantimonohub.add(expr= served_by_hub[hub_node] <= model.max_hub_share * network.total_demand )
+
+    # Each hub must handle at least min_hub_share (1%) of demand
+    model.minantimonohub = pyo.ConstraintList()
+    for hub_node in network.hubs:
+        model.minantimonohub.add(expr= served_by_hub[hub_node] >= model.min_hub_share * network.total_demand )
+
+
+def solve_model(model, opt, start=None):
+    # Solve without loading so an infeasible run is reported instead of raised; returns (solution loaded, termination condition)
+    if start is not None and opt.warm_start_capable():
+        model.X.set_values(start['X'])
+        model.Y.set_values(start['Y'])
+        results = opt.solve(model, warmstart=True, load_solutions=False)
+    else:
+        results = opt.solve(model, load_solutions=False)
+    if len(results.solution) == 0:
+        return False, str(results.solver.termination_condition)
+    model.solutions.load_from(results)
+    return True, str(results.solver.termination_condition)
+
+
+def solution_start(model):
+    # Rounded X/Y of the loaded solution, to warm-start a later solve_model
+    return {'X': {i: round(pyo.value(model.X[i])) for i in model.X},
+            'Y': {i: round(pyo.value(model.Y[i])) for i in model.Y}}
+
+
+def hub_assignment(model, network):
+    # Hub serving each destination in the loaded solution
+    return {destination: hub for (hub, destination), path in network.hub_destination_path.items()
+            if pyo.value(model.Y[path]) > 0.5}
+
+
+def extract_solution(model, case):
+    # Result tables of the notebook: paths with Xij / Yjk, hub utilisation, origin totals and the hub serving each destination
+    o_h_tcost = case['origin_hub_tcost'].copy()
+    h_d_tcost = case['hub_destination_tcost'].copy()
+    hub = case['hub_id'].copy()
+
+    o_h_tcost['Xij'] = [pyo.value(model.X[g]) for g in o_h_tcost.path]
+    h_d_tcost['Yjk'] = [pyo.value(model.Y[g]) for g in h_d_tcost.path]
+
+    hub['utilized_size'] = o_h_tcost.groupby('hub')['Xij'].sum().reset_index()['Xij']
+
+    origin = pd.DataFrame(o_h_tcost['origin'].unique(), columns=['origin'])
+    origin['Xij'] = o_h_tcost.groupby('origin')['Xij'].sum().reset_index()['Xij']
+
+    destination = pd.DataFrame(h_d_tcost['destination'].unique(), columns=['destination'])
+    destination['hub'] = destination['destination'].map(h_d_tcost.loc[h_d_tcost['Yjk'] > 0.5].set_index('destination')['hub'])
+
+    return o_h_tcost, h_d_tcost, hub, origin, destination
@@ -0,0 +1,183 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyomo.environ as pyo
+
+from beef_network import CE, BeefNetwork, build_model, hub_assignment, solution_start, solve_model
+
+
+# Weight on the other cost when minimising one of them, only to pick the non-dominated optimum among ties
+TIE_WEIGHT = 1e-6
+
+# State of one worker process: the frontier model it built once
+_worker = {}
+
+
+def add_frontier_objective(model):
+    # Replace the fixed CE weighting by mutable weights on the two costs, plus a carbon cap for epsilon-constraint solves
+    model.transport_weight = pyo.Param(initialize=1.0, mutable=True)
+    model.carbon_weight = pyo.Param(initialize=CE, mutable=True)
+    model.carbon_limit = pyo.Param(initialize=0.0, mutable=True)
+
+    model.obj.deactivate()
+    model.frontier_obj = pyo.Objective(expr=model.transport_weight * model.transport_cost + model.carbon_weight * model.carbon_cost,
+                                       sense=pyo.minimize)
+    model.carbon_cap = pyo.Constraint(expr=model.carbon_cost <= model.carbon_limit)
+    model.carbon_cap.deactivate()
+    return model
+
+
+def _init_worker(case, solver):
+    network = BeefNetwork(case)
+    model = add_frontier_objective(build_model(case, network=network))
+    _worker.update(network=network, model=model, opt=pyo.SolverFactory(solver))
+
+
+def _solve_point(task):
+    # task is (transport weight, carbon weight, carbon cap or None, warm start or None)
+    transport_weight, carbon_weight, carbon_limit, start = task
+    model = _worker['model']
+    model.transport_weight.set_value(transport_weight)
+    model.carbon_weight.set_value(carbon_weight)
+    if carbon_limit is None:
+        model.carbon_cap.deactivate()
+    else:
+        model.carbon_limit.set_value(carbon_limit)
+        model.carbon_cap.activate()
+
+    feasible, status = solve_model(model, _worker['opt'], start)
+    if not feasible:
+        return None
+    return {
+        'Transport Cost': pyo.value(model.transport_cost),
+        'Carbon Cost': pyo.value(model.carbon_cost),
+        'Assignment': hub_assignment(model, _worker['network']),
+        'start': solution_start(model),
+    }
+
+
+def _weights(a, b):
+    # Weights normal to the segment from a (cheaper, more carbon) to b, scaled to sum to 1
+    transport_weight = a['Carbon Cost'] - b['Carbon Cost']
+    carbon_weight = b['Transport Cost'] - a['Transport Cost']
+    total = transport_weight + carbon_weight
+    return transport_weight / total, carbon_weight / total
+
+
+def pareto_frontier(case, solver='cbc', max_points=40, resolution=0.02, tol=1e-4, fill=True, workers=None):
+    """Transport cost versus carbon cost frontier of the Beef network.
+
+    Both end points are solved first (each cost minimised with a tie-break
+    weight on the other). Supported points are then found adaptively: the
+    segment between two neighbouring points is probed with weights normal to
+    it and split only when the probe lands below it (by more than `tol`), so
+    solves gather where the curve bends and a straight stretch costs one
+    solve. With fill=True the gaps between supported points, where a MIP can
+    have points no weighted sum reaches, are bisected by epsilon-constraint
+    solves: the cheapest transport with the carbon cost capped at the middle
+    of the unexplored carbon interval. Every point such a probe finds is
+    kept and splits the interval, even one on the segment, since a MIP can
+    have further points on either side of it. A gap is only closed when the
+    interval is narrower than `resolution` times the carbon range, or its
+    probes keep returning the lower end b. Every probe is warm-started from a
+    neighbouring point, and the probes of one round run concurrently;
+    `workers` defaults to the number of CPUs, and workers=1 solves in this
+    process. At most `max_points` points are returned.
+
+    Returns (frontier, assignment): one frontier row per point, cheapest
+    transport first, with Transport Cost, Carbon Cost, Total at CE (the
+    notebook's objective), Method and Open Hubs; and the hub serving each
+    destination, one column per frontier row.
+
+    The shipped case workbook prices carbon at a constant share of transport
+    on every path, so its frontier is a single point; random_case with
+    independent_carbon=True gives networks with a real trade-off.
+    """
+    pool = None
+    if workers != 1:
+        workers = workers or os.cpu_count()
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(case, solver))
+    else:
+        _init_worker(case, solver)
+
+    def run(tasks):
+        return list(pool.map(_solve_point, tasks)) if pool is not None else [_solve_point(task) for task in tasks]
+
+    try:
+        cheapest, cleanest = run([(1.0, TIE_WEIGHT, None, None), (TIE_WEIGHT, 1.0, None, None)])
+        if cheapest is None:
+            raise RuntimeError('The Beef model has no feasible solution')
+        cheapest['Method'] = cleanest['Method'] = 'weighted'
+        points = [cheapest]
+        carbon_range = cheapest['Carbon Cost'] - cleanest['Carbon Cost']
+        step = tol * max(carbon_range, 1.0)
+        if carbon_range > step:
+            points.append(cleanest)
+
+        # Weighted-sum rounds: every open segment of the round is probed at once
+        segments = [(cheapest, cleanest)] if len(points) == 2 else []
+        closed = []
+        while segments and len(points) < max_points:
+            batch, segments = segments[:max_points - len(points)], segments[max_points - len(points):]
+            weights = [_weights(a, b) for a, b in batch]
+            found = run([(w_transport, w_carbon, None, a['start']) for (a, b), (w_transport, w_carbon) in zip(batch, weights)])
+            for (a, b), (w_transport, w_carbon), point in zip(batch, weights, found):
+                segment_value = w_transport * a['Transport Cost'] + w_carbon * a['Carbon Cost']
+                if point is not None and w_transport * point['Transport Cost'] + w_carbon * point['Carbon Cost'] < segment_value - tol * abs(segment_value):
+                    point['Method'] = 'weighted'
+                    points.append(point)
+                    segments += [(a, point), (point, b)]
+                else:
+                    closed.append((a, b))
+
+        # Epsilon-constraint rounds over gaps (a, b, low, high): carbon in (low, high) is unexplored, a lies above it and b below.
+        # The cheapest point with carbon capped at the middle is either b, leaving only the upper half, or a new frontier
+        # point (on the segment a-b or above it) with both sides of it still unexplored: (middle, high) above, as carbon
+        # between the point and the cap cannot be cheaper, and (low, point) below
+        width = resolution * carbon_range
+        gaps = [(a, b, b['Carbon Cost'], a['Carbon Cost']) for a, b in closed] if fill else []
+        while gaps and len(points) < max_points:
+            gaps = [gap for gap in gaps if gap[3] - gap[2] > width]
+            batch, gaps = gaps[:max_points - len(points)], gaps[max_points - len(points):]
+            middles = [(low + high) / 2 for a, b, low, high in batch]
+            found = run([(1.0, TIE_WEIGHT, middle, b['start']) for (a, b, low, high), middle in zip(batch, middles)])
+            for (a, b, low, high), middle, point in zip(batch, middles, found):
+                if point is None or point['Carbon Cost'] <= low + step:
+                    gaps.append((a, b, middle, high))
+                else:
+                    point['Method'] = 'epsilon'
+                    points.append(point)
+                    gaps += [(a, point, middle, high), (point, b, low, point['Carbon Cost'])]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    points.sort(key=lambda point: (point['Transport Cost'], -point['Carbon Cost']))
+    frontier = pd.DataFrame({
+        'Transport Cost': [point['Transport Cost'] for point in points],
+        'Carbon Cost': [point['Carbon Cost'] for point in points],
+        'Total at CE': [point['Transport Cost'] + CE * point['Carbon Cost'] for point in points],
+        'Method': [point['Method'] for point in points],
+        'Open Hubs': [', '.join(str(hub) for hub in sorted(set(point['Assignment'].values()))) for point in points],
+    })
+    assignment = pd.DataFrame({n: pd.Series(point['Assignment']) for n, point in enumerate(points)}).sort_index()
+    assignment.index.name = 'destination'
+    return frontier, assignment
+
+
+if __name__ == '__main__':
+    import sys
+
+    from beef_network import load_case
+
+    # e.g. python beef_pareto.py cbc 4
+    solver = sys.argv[1] if len(sys.argv) > 1 else 'cbc'
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    frontier, assignment = pareto_frontier(load_case('input_transportation_case.xlsx'), solver=solver, workers=workers)
+    pd.set_option('display.width', 200)
+    print("Cost versus Carbon Frontier")
+    print(frontier.to_string())
+    print("\nHub Serving Each Destination per Frontier Point")
+    print(assignment.to_string())
@@ -0,0 +1,92 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import pandas as pd
+import pyomo.environ as pyo
+
+from beef_network import ANTI_MONOPOLY_SHARES, BeefNetwork, build_model, solution_start, solve_model
+
+
+# State of one worker process: the model it built once, re-solved for every scenario it gets
+_worker = {}
+
+
+def threshold_grid(max_supplier_share=(0.5,), min_supplier_share=(0.05,), max_hub_share=(0.5,), min_hub_share=(0.01,)):
+    # Every combination of the given thresholds, one scenario dict per combination
+    names = list(ANTI_MONOPOLY_SHARES)
+    values = [max_supplier_share, min_supplier_share, max_hub_share, min_hub_share]
+    return [dict(zip(names, combination)) for combination in product(*values)]
+
+
+def _init_worker(case, solver, start, model=None):
+    network = BeefNetwork(case)
+    if model is None:
+        model = build_model(case, anti_monopoly=True, network=network)
+    _worker.update(network=network, model=model, opt=pyo.SolverFactory(solver), start=start)
+
+
+def _solve_scenario(shares):
+    # Thresholds a scenario leaves out take the notebook's value, not the previous scenario's
+    model, network = _worker['model'], _worker['network']
+    shares = {name: shares.get(name, default) for name, default in ANTI_MONOPOLY_SHARES.items()}
+    for name, share in shares.items():
+        getattr(model, name).set_value(share)
+
+    start = time.perf_counter()
+    feasible, status = solve_model(model, _worker['opt'], _worker['start'])
+    row = dict(shares, Feasible=feasible, Status=status, Seconds=time.perf_counter() - start)
+    if feasible:
+        row['Cost'] = pyo.value(model.obj)
+        # Hub utilization: kilograms received from the origins
+        for hub in network.hubs:
+            row[f'Hub {hub}'] = sum(pyo.value(model.X[path]) for path in network.hub_in_paths.get(hub, []))
+    return row
+
+
+def run_scenarios(case, scenarios, solver='cbc', workers=None):
+    """Cost and hub utilization of the anti-monopoly model for every threshold scenario.
+
+    `scenarios` is a list of dicts with any of the ANTI_MONOPOLY_SHARES keys,
+    e.g. from threshold_grid(). The notebook's thresholds are solved first
+    and their X/Y solution warm-starts every scenario (when the solver
+    accepts warm starts). Each worker process builds the model once and only
+    changes the mutable shares between solves. `workers` defaults to the
+    number of CPUs, and workers=1 solves in this process on the base model.
+
+    Returns one row per scenario, in the order given: the thresholds,
+    Feasible, solver Status, Seconds, Cost and the kilograms handled by each
+    hub. Infeasible combinations have Feasible False and no cost.
+    """
+    base = build_model(case, anti_monopoly=True)
+    opt = pyo.SolverFactory(solver)
+    feasible, status = solve_model(base, opt)
+    start = solution_start(base) if feasible else None
+
+    if workers == 1:
+        _init_worker(case, solver, start, model=base)
+        rows = [_solve_scenario(shares) for shares in scenarios]
+    else:
+        workers = workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(case, solver, start)) as pool:
+            rows = list(pool.map(_solve_scenario, scenarios, chunksize=max(1, len(scenarios) // (4 * workers))))
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    import sys
+
+    from beef_network import load_case
+
+    # Nightly grid, e.g. python beef_scenarios.py cbc 4
+    solver = sys.argv[1] if len(sys.argv) > 1 else 'cbc'
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    scenarios = threshold_grid(max_supplier_share=(0.3, 0.4, 0.5), min_supplier_share=(0.0, 0.05, 0.1),
+                               max_hub_share=(0.4, 0.5, 0.6), min_hub_share=(0.0, 0.01, 0.1))
+    table = run_scenarios(load_case('input_transportation_case.xlsx'), scenarios, solver=solver, workers=workers)
+    pd.set_option('display.width', 200)
+    print(table.to_string(index=False))
+    print(f"\n{(~table['Feasible']).sum()} of {len(table)} combinations are infeasible")
@@ -0,0 +1,53 @@
+import sys
+import time
+
+import pyomo.environ as pyo
+
+from hub_benders import benders
+from hub_cost import HubCosts, load_cost_matrix, random_cost_matrix
+from hub_model import build_model
+
+
+# Change solver if needed, e.g. python benchmark_benders.py cbc
+solver = sys.argv[1] if len(sys.argv) > 1 else 'glpk'
+
+# The monolithic model is skipped above this many x variables
+monolithic_limit = 100_000
+
+
+def solve_monolithic(costs, p):
+    start = time.perf_counter()
+    model = build_model(costs, p)
+    build_time = time.perf_counter() - start
+    pyo.SolverFactory(solver).solve(model)
+    return pyo.value(model.obj), build_time, time.perf_counter() - start - build_time
+
+
+if __name__ == '__main__':
+    instances = [
+        ('cost_matrix_multi_hub.xlsx', load_cost_matrix('cost_matrix_multi_hub.xlsx'), 3),
+        ('cost_matrix_multi_hub_extended.xlsx', load_cost_matrix('cost_matrix_multi_hub_extended.xlsx'), 3),
+        ('synthetic 20x8', random_cost_matrix(20, 8, seed=20), 3),
+        ('synthetic 40x12', random_cost_matrix(40, 12, seed=40), 4),
+        ('synthetic 60x10', random_cost_matrix(60, 10, seed=60), 3),
+    ]
+
+    print(f"{'instance':<38}{'p':>3}{'x vars':>10}{'mono obj':>12}{'build s':>9}{'solve s':>9}{'benders obj':>13}{'iters':>7}{'gap':>9}{'total s':>9}")
+    for name, cost_df, p in instances:
+        costs = HubCosts(cost_df)
+        x_vars = len(costs.pairs) * len(costs.hub_pairs)
+
+        if x_vars <= monolithic_limit:
+            mono_value, build_time, solve_time = solve_monolithic(costs, p)
+            mono_cols = f'{mono_value:>12,.0f}{build_time:>9.2f}{solve_time:>9.2f}'
+        else:
+            mono_cols = f"{'skipped':>12}{'-':>9}{'-':>9}"
+
+        value, open_hubs, history = benders(costs, p, solver=solver, time_limit=600)
+        last = history.iloc[-1]
+        print(f"{name:<38}{p:>3}{x_vars:>10,}{mono_cols}{value:>13,.0f}{len(history):>7}{last['Gap']:>9.2%}{last['Seconds']:>9.2f}")
+
+    # Per-iteration bounds on the extended sample matrix
+    costs = HubCosts(load_cost_matrix('cost_matrix_multi_hub_extended.xlsx'))
+    print()
+    print(benders(costs, 2, solver=solver)[2].to_string(index=False))
@@ -0,0 +1,70 @@
+import time
+import tracemalloc
+
+import numpy as np
+
+from hub_cost import HubCosts, load_cost_matrix, random_cost_matrix
+
+
+# Original construction used by multi_hub_app.py / multi_hub.ipynb
+def build_cost_dict(cost_df):
+    cost = {}
+    for i in cost_df.index:
+        for j in cost_df.index:
+            if i != j:
+                for k in cost_df.columns:
+                    for m in cost_df.columns:
+                        if k != m:
+                            cost[(i, k, m, j)] = cost_df.loc[i, k] + cost_df.loc[j, m]
+    return cost
+
+
+def build_cost_array(cost_df):
+    costs = HubCosts(cost_df)
+    return costs, costs.pair_costs()
+
+
+def measure(build, cost_df):
+    # Time and peak memory come from separate runs, tracemalloc slows the dict loop down
+    start = time.perf_counter()
+    result = build(cost_df)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    build(cost_df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def check_same_costs(cost, costs, pair_costs):
+    for a, (i, j) in enumerate(costs.pairs):
+        for b, (k, m) in enumerate(costs.hub_pairs):
+            assert cost[(i, k, m, j)] == pair_costs[a, b]
+
+
+if __name__ == '__main__':
+    instances = [('cost_matrix_multi_hub_extended.xlsx', load_cost_matrix('cost_matrix_multi_hub_extended.xlsx'))]
+    for n_nodes, n_hubs in [(50, 10), (100, 20), (200, 30)]:
+        instances.append((f'synthetic {n_nodes}x{n_hubs}', random_cost_matrix(n_nodes, n_hubs, seed=n_nodes)))
+
+    # The dict build is skipped above this many entries, it takes minutes
+    dict_limit = 2_000_000
+
+    print(f"{'instance':<40}{'entries':>12}{'dict s':>10}{'dict MB':>10}{'array s':>10}{'array MB':>10}{'speedup':>10}")
+    for name, cost_df in instances:
+        n_nodes, n_hubs = cost_df.shape
+        entries = n_nodes * (n_nodes - 1) * n_hubs * (n_hubs - 1)
+
+        (costs, pair_costs), array_time, array_mb = measure(build_cost_array, cost_df)
+
+        if entries <= dict_limit:
+            cost, dict_time, dict_mb = measure(build_cost_dict, cost_df)
+            check_same_costs(cost, costs, pair_costs)
+            speedup = f'{dict_time / array_time:,.0f}x'
+            dict_cols = f'{dict_time:>10.3f}{dict_mb:>10.1f}'
+        else:
+            speedup = '-'
+            dict_cols = f"{'skipped':>10}{'-':>10}"
+
+        print(f'{name:<40}{entries:>12,}{dict_cols}{array_time:>10.3f}{array_mb:>10.1f}{speedup:>10}')
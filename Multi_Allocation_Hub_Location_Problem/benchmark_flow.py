@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+import time
+
+import pyomo.environ as pyo
+
+from hub_cost import HubCosts, load_cost_matrix, random_cost_matrix
+from hub_flow import build_flow_model
+from hub_model import build_model
+
+
+# Solver for both formulations, e.g. python benchmark_flow.py cbc
+solver = sys.argv[1] if len(sys.argv) > 1 else 'glpk'
+
+# Instances are only built, not solved, above this many variables
+solve_limit = 20_000
+
+
+def measure(build, costs, p, directory):
+    # Build seconds, variables, constraints, LP bytes, solve seconds (None if skipped) and objective
+    start = time.perf_counter()
+    model = build(costs, p)
+    build_time = time.perf_counter() - start
+
+    path = os.path.join(directory, 'model.lp')
+    model.write(path, io_options={'symbolic_solver_labels': False})
+    lp_bytes = os.path.getsize(path)
+
+    solve_time = objective = None
+    if model.nvariables() <= solve_limit:
+        start = time.perf_counter()
+        pyo.SolverFactory(solver).solve(model)
+        solve_time = time.perf_counter() - start
+        objective = pyo.value(model.obj)
+    return build_time, model.nvariables(), model.nconstraints(), lp_bytes, solve_time, objective
+
+
+if __name__ == '__main__':
+    instances = [
+        ('cost_matrix_multi_hub.xlsx', load_cost_matrix('cost_matrix_multi_hub.xlsx'), 3),
+        ('cost_matrix_multi_hub_extended.xlsx', load_cost_matrix('cost_matrix_multi_hub_extended.xlsx'), 3),
+        ('synthetic 14x7', random_cost_matrix(14, 7, seed=14), 3),
+        ('synthetic 20x8', random_cost_matrix(20, 8, seed=20), 3),
+        ('synthetic 30x10', random_cost_matrix(30, 10, seed=30), 4),
+        ('synthetic 50x12', random_cost_matrix(50, 12, seed=50), 4),
+        ('synthetic 80x15', random_cost_matrix(80, 15, seed=80), 5),
+    ]
+
+    print(f"{'instance':<38}{'model':<7}{'vars':>10}{'cons':>9}{'build':>8}{'LP MB':>8}{'solve':>9}{'objective':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, cost_df, p in instances:
+            costs = HubCosts(cost_df)
+            for label, build in [('path', build_model), ('flow', build_flow_model)]:
+                build_time, n_vars, n_cons, lp_bytes, solve_time, objective = measure(build, costs, p, directory)
+                solve_cols = f'{solve_time:>9.2f}{objective:>11,.0f}' if solve_time is not None else f"{'skipped':>9}{'-':>11}"
+                print(f"{name:<38}{label:<7}{n_vars:>10,}{n_cons:>9,}{build_time:>8.2f}{lp_bytes / 1e6:>8.2f}{solve_cols}", flush=True)
@@ -0,0 +1,64 @@
+import sys
+import time
+
+import pyomo.environ as pyo
+
+from hub_cost import HubCosts, load_cost_matrix, random_cost_matrix
+from hub_evaluate import enumerate_hub_sets
+from hub_model import build_model
+from hub_prune import pruning_report
+
+
+# Solver for both models, e.g. python benchmark_prune.py cbc
+solver = sys.argv[1] if len(sys.argv) > 1 else 'glpk'
+
+# Larger instances are only built, not solved, above this many full-model x variables
+solve_limit = 20_000
+
+
+if __name__ == '__main__':
+    instances = [
+        ('cost_matrix_multi_hub.xlsx', load_cost_matrix('cost_matrix_multi_hub.xlsx'), 3),
+        ('cost_matrix_multi_hub.xlsx', load_cost_matrix('cost_matrix_multi_hub.xlsx'), 4),
+        ('cost_matrix_multi_hub_extended.xlsx', load_cost_matrix('cost_matrix_multi_hub_extended.xlsx'), 3),
+        ('cost_matrix_multi_hub_extended.xlsx', load_cost_matrix('cost_matrix_multi_hub_extended.xlsx'), 5),
+        ('synthetic 14x7', random_cost_matrix(14, 7, seed=14), 3),
+        ('synthetic 30x10', random_cost_matrix(30, 10, seed=30), 4),
+        ('synthetic 50x12', random_cost_matrix(50, 12, seed=50), 4),
+    ]
+
+    print(f"{'instance':<38}{'p':>3}{'x vars':>10}{'kept':>10}{'pruned':>8}{'full build':>12}{'pruned build':>14}"
+          f"{'full solve':>12}{'pruned solve':>14}{'full obj':>10}{'pruned obj':>12}{'enum obj':>10}")
+    for name, cost_df, p in instances:
+        costs = HubCosts(cost_df)
+
+        start = time.perf_counter()
+        full = build_model(costs, p)
+        full_build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pruned = build_model(costs, p, prune=True)
+        pruned_build = time.perf_counter() - start
+
+        x_vars, kept = len(full.x), len(pruned.x)
+        columns = f"{name:<38}{p:>3}{x_vars:>10,}{kept:>10,}{1 - kept / x_vars:>8.1%}{full_build:>12.2f}{pruned_build:>14.2f}"
+
+        if x_vars <= solve_limit:
+            # Both objectives must equal the proven optimum from enumerating every hub set
+            start = time.perf_counter()
+            pyo.SolverFactory(solver).solve(full)
+            full_solve = time.perf_counter() - start
+
+            start = time.perf_counter()
+            pyo.SolverFactory(solver).solve(pruned)
+            pruned_solve = time.perf_counter() - start
+
+            enum_value = enumerate_hub_sets(costs, p)[0]
+            columns += f'{full_solve:>12.2f}{pruned_solve:>14.2f}{pyo.value(full.obj):>10,.0f}{pyo.value(pruned.obj):>12,.0f}{enum_value:>10,.0f}'
+        else:
+            columns += f"{'skipped':>12}{'skipped':>14}{'-':>10}{'-':>12}{'-':>10}"
+        print(columns)
+
+    # Share of paths pruned for every hub count of the extended sample
+    print()
+    print(pruning_report(HubCosts(load_cost_matrix('cost_matrix_multi_hub_extended.xlsx'))).to_string(index=False))
@@ -0,0 +1,55 @@
+import sys
+import time
+
+import pyomo.environ as pyo
+
+from hub_cost import HubCosts, load_cost_matrix, random_cost_matrix
+from hub_model import build_model
+from hub_sparse import build_matrices, solve_sparse
+
+
+# Solver for the Pyomo path, e.g. python benchmark_sparse.py cbc
+solver = sys.argv[1] if len(sys.argv) > 1 else 'glpk'
+
+# Larger instances are only built, not solved, above this many x variables
+solve_limit = 20_000
+
+
+if __name__ == '__main__':
+    instances = [
+        ('cost_matrix_multi_hub.xlsx', load_cost_matrix('cost_matrix_multi_hub.xlsx'), 3),
+        ('cost_matrix_multi_hub_extended.xlsx', load_cost_matrix('cost_matrix_multi_hub_extended.xlsx'), 3),
+        ('synthetic 14x7', random_cost_matrix(14, 7, seed=14), 3),
+        ('synthetic 30x10', random_cost_matrix(30, 10, seed=30), 4),
+        ('synthetic 50x12', random_cost_matrix(50, 12, seed=50), 4),
+    ]
+
+    print(f"{'instance':<38}{'x vars':>10}{'pyomo build':>13}{'pyomo solve':>13}{'sparse build':>14}{'sparse solve':>14}{'pyomo obj':>11}{'sparse obj':>12}")
+    for name, cost_df, p in instances:
+        costs = HubCosts(cost_df)
+        x_vars = len(costs.pairs) * len(costs.hub_pairs)
+
+        start = time.perf_counter()
+        model = build_model(costs, p)
+        pyomo_build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build_matrices(costs, p)
+        sparse_build = time.perf_counter() - start
+
+        if x_vars <= solve_limit:
+            # Pyomo solve time includes writing the problem for the solver
+            start = time.perf_counter()
+            pyo.SolverFactory(solver).solve(model)
+            pyomo_solve = time.perf_counter() - start
+            pyomo_value = pyo.value(model.obj)
+
+            # solve_sparse builds again, its build share is reported separately above
+            start = time.perf_counter()
+            sparse_value, _ = solve_sparse(costs, p)
+            sparse_solve = time.perf_counter() - start - sparse_build
+            solve_cols = f'{pyomo_solve:>13.2f}{sparse_build:>14.3f}{sparse_solve:>14.2f}{pyomo_value:>11,.0f}{sparse_value:>12,.0f}'
+        else:
+            solve_cols = f"{'skipped':>13}{sparse_build:>14.3f}{'skipped':>14}{'-':>11}{'-':>12}"
+
+        print(f"{name:<38}{x_vars:>10,}{pyomo_build:>13.2f}{solve_cols}")
@@ -0,0 +1,23 @@
+import sys
+
+from hub_cost import HubCosts, load_cost_matrix, random_cost_matrix
+from hub_sweep import sweep_p
+
+
+# Change solver if needed, e.g. python benchmark_sweep.py cbc (warm starts need a capable solver)
+solver = sys.argv[1] if len(sys.argv) > 1 else 'glpk'
+
+
+if __name__ == '__main__':
+    instances = [
+        ('cost_matrix_multi_hub.xlsx', load_cost_matrix('cost_matrix_multi_hub.xlsx')),
+        ('cost_matrix_multi_hub_extended.xlsx', load_cost_matrix('cost_matrix_multi_hub_extended.xlsx')),
+        ('synthetic 14x7', random_cost_matrix(14, 7, seed=3)),
+    ]
+
+    for name, cost_df in instances:
+        results = sweep_p(HubCosts(cost_df), solver=solver, compare=True)
+        print(name)
+        print(results.to_string(index=False))
+        print(f"total: sweep {results['Seconds'].sum():.2f} s, independent {results['Independent Seconds'].sum():.2f} s")
+        print()
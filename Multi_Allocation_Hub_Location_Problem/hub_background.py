@@ -0,0 +1,274 @@
+import math
+import os
+import re
+import signal
+import sys
+import tempfile
+import time
+import traceback
+from multiprocessing import get_context
+
+from hub_benders import benders
+from hub_evaluate import allocate
+from hub_flow import build_flow_model, extract_flow_allocation
+from hub_model import build_model, extract_allocation
+from hub_sweep import sweep_p
+
+# solver_race.py lives in the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from solver_race import SolverRace, configure_solver, installed_solvers, single_solver, solve_logged
+
+
+# Progress lines in each solver's log: (pattern, group of the incumbent, group of the bound)
+PROGRESS_PATTERNS = {
+    # +  1234: mip =   1.500000000e+03 >=   1.400000000e+03   6.7% (12; 0)
+    'glpk': [(re.compile(r'^\+\s*\d+:\s+(?:mip =|>>>>>)\s+(not found yet|\S+)\s+>=\s+(\S+)'), 1, 2)],
+    # Cbc0010I After 1000 nodes, 36 on tree, 1500 best solution, best possible 1400 (1.23 seconds)
+    'cbc': [(re.compile(r'(\S+) best solution, best possible (\S+)'), 1, 2),
+            (re.compile(r'Integer solution of (\S+) found'), 1, None)],
+    #  T       0       0         0   0.00%   6320            7602              16.86%   ...
+    'appsi_highs': [(re.compile(r'^\s*[A-Za-z]?\s+\d+\s+\d+\s+\d+\s+[\d.]+%\s+(\S+)\s+(\S+)\s+\S+'), 2, 1)],
+    # Benders iteration 3: lower bound 1400.0, upper bound 1500.0 (written by _benders_worker)
+    'benders': [(re.compile(r'lower bound (\S+), upper bound (\S+)'), 2, 1)],
+}
+
+# Default relative gap of a Benders run, as in hub_benders.benders
+BENDERS_TOL = 1e-6
+
+
+def _number(text):
+    # Float of a log field, None for 'not found yet', -inf/inf, CBC's 1e+50 and the like
+    try:
+        value = float(text)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) and abs(value) < 1e49 else None
+
+
+def parse_progress(solver, log):
+    # Last incumbent objective and bound reported in a solver log, None until one appears
+    incumbent = bound = None
+    for line in log.splitlines():
+        for pattern, incumbent_group, bound_group in PROGRESS_PATTERNS.get(solver, []):
+            match = pattern.search(line)
+            if not match:
+                continue
+            value = _number(match.group(incumbent_group))
+            incumbent = value if value is not None else incumbent
+            if bound_group is not None:
+                value = _number(match.group(bound_group))
+                bound = value if value is not None else bound
+    return incumbent, bound
+
+
+def _solve_worker(connection, log_path, costs, p, formulation, prune, solver, time_limit, mip_gap):
+    # Runs in its own process (and process group, so a cancel also stops the solver executable)
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    seconds = {}
+    try:
+        start = time.perf_counter()
+        model = build_flow_model(costs, p) if formulation == 'flow' else build_model(costs, p, prune=prune)
+        seconds['build'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        race = None
+        if solver == 'race':
+            # Every installed solver at once, each logging to <solver>.log next to log_path. The racers have
+            # their own process groups: a cancel (SIGTERM) unwinds through SolverRace.solve, which stops them
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+            race = SolverRace(time_limit=time_limit, mip_gap=mip_gap, log_directory=os.path.dirname(log_path))
+            results = race.solve(model, load_solutions=False)
+        else:
+            results = solve_logged(configure_solver(solver, time_limit, mip_gap), solver, model, log_path)
+        seconds['solve'] = time.perf_counter() - start
+
+        termination = str(results.solver.termination_condition)
+        if not len(results.solution):
+            connection.send({'error': f'No solution found ({termination})', 'termination': termination, 'seconds': seconds,
+                             'race': None if race is None else race.table})
+            return
+        model.solutions.load_from(results)
+
+        start = time.perf_counter()
+        if formulation == 'flow':
+            objective_value, allocation_plan = extract_flow_allocation(model, costs)
+        else:
+            objective_value, allocation_plan = extract_allocation(model, costs)
+        seconds['extract'] = time.perf_counter() - start
+
+        open_hubs = [hub for hub, value in model.y.extract_values().items() if value is not None and value > 0.5]
+        connection.send({'objective': objective_value, 'allocation_plan': allocation_plan, 'open_hubs': open_hubs,
+                         'termination': termination, 'bound': _number(results.problem.lower_bound), 'seconds': seconds,
+                         'variables': model.nvariables(), 'constraints': model.nconstraints(),
+                         'paths': len(model.x) if formulation == 'path' else None,
+                         'winner': None if race is None else race.winner,
+                         'race': None if race is None else race.table})
+    except Exception:
+        connection.send({'error': traceback.format_exc(), 'seconds': seconds})
+
+
+def _benders_worker(connection, log_path, costs, p, solver, time_limit, mip_gap):
+    # Benders decomposition in its own process group, one progress line per iteration in the log
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    seconds = {}
+    try:
+        tol = max(mip_gap or 0.0, BENDERS_TOL)
+        start = time.perf_counter()
+        with open(log_path, 'w', buffering=1) as log:
+            def report(progress):
+                log.write(f"Benders iteration {progress['Iteration']}: lower bound {progress['Lower Bound']}, "
+                          f"upper bound {progress['Upper Bound']}\n")
+            objective_value, open_hubs, history = benders(costs, p, solver=solver, tol=tol, time_limit=time_limit, callback=report)
+        seconds['solve'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        objective_value, allocation_plan = allocate(costs, open_hubs)
+        seconds['extract'] = time.perf_counter() - start
+
+        # Converged within the gap, or stopped by the time limit (or a master that did not finish) with the best hub set
+        converged = len(history) > 0 and history['Gap'].iloc[-1] <= tol
+        connection.send({'objective': objective_value, 'allocation_plan': allocation_plan, 'open_hubs': open_hubs,
+                         'termination': 'optimal' if converged else 'stopped',
+                         'bound': _number(history['Lower Bound'].iloc[-1]) if len(history) else None,
+                         'seconds': seconds, 'history': history, 'solver': solver, 'paths': None, 'winner': None, 'race': None})
+    except Exception:
+        connection.send({'error': traceback.format_exc(), 'seconds': seconds})
+
+
+def _sweep_worker(connection, log_path, costs, prune, solver, time_limit, mip_gap):
+    # Every p on one model in its own process group, one line per finished point in the log
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    seconds = {}
+    try:
+        start = time.perf_counter()
+        model = build_model(costs, 2, prune=prune)
+        seconds['build'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(log_path, 'w', buffering=1) as log:
+            def report(row):
+                log.write(f"p = {row['p']}: {row['Termination']}, objective {row['Objective']}\n")
+            table = sweep_p(costs, solver=solver, model=model, time_limit=time_limit, mip_gap=mip_gap, callback=report)
+        seconds['sweep'] = time.perf_counter() - start
+        connection.send({'sweep': table, 'seconds': seconds,
+                         'variables': model.nvariables(), 'constraints': model.nconstraints()})
+    except Exception:
+        connection.send({'error': traceback.format_exc(), 'seconds': seconds})
+
+
+class BackgroundSolve:
+    """A hub MILP built and solved in a separate process, polled for progress and cancellable.
+
+    With method='milp' the worker builds the path (`formulation='path'`,
+    optionally pruned) or flow model, solves it with the time limit and
+    relative gap passed to the solver, and sends back the objective and
+    allocation plan. When the limit is hit the best incumbent is returned.
+    solver='race' races every installed solver (solver_race.SolverRace) and
+    reports the winner. method='benders' runs hub_benders.benders with the
+    gap as its stopping gap, and method='sweep' runs hub_sweep.sweep_p over
+    every p with the limits on each point; both use the first installed
+    solver for 'race'. Progress (incumbent objective and bound) is read from
+    the logs while it runs, so the caller never blocks. Start it with start().
+    """
+
+    def __init__(self, costs, p, formulation='path', prune=False, solver='glpk', time_limit=None, mip_gap=None, method='milp'):
+        self.method, self.formulation, self.prune = method, formulation, prune
+        self.solver = solver if method == 'milp' else single_solver(solver)
+        self.racers = installed_solvers() if self.solver == 'race' else [self.solver]
+        self._directory = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self._directory.name, 'solver.log')
+        if method == 'milp':
+            self._target = _solve_worker
+            self._args = (self.log_path, costs, p, formulation, prune, self.solver, time_limit, mip_gap)
+        elif method == 'benders':
+            self._target = _benders_worker
+            self._args = (self.log_path, costs, p, self.solver, time_limit, mip_gap)
+        elif method == 'sweep':
+            self._target = _sweep_worker
+            self._args = (self.log_path, costs, prune, self.solver, time_limit, mip_gap)
+        else:
+            raise ValueError(f"method must be 'milp', 'benders' or 'sweep', got {method!r}")
+        self.process = None
+        self.started = None
+        self.finished = None
+        self.cancelled = False
+        self._result = None
+
+    def start(self):
+        # A fresh interpreter, not a fork of the (threaded) caller; not a daemon, so a race can start its solvers
+        receive, send = get_context('spawn').Pipe(duplex=False)
+        self._connection = receive
+        self.process = get_context('spawn').Process(target=self._target, args=(send,) + self._args)
+        self.started = time.perf_counter()
+        self.process.start()
+        send.close()
+        return self
+
+    def _log_path(self, solver):
+        # A race logs one file per solver, see SolverRace
+        return os.path.join(self._directory.name, f'{solver}.log') if self.solver == 'race' else self.log_path
+
+    def log(self, solver=None):
+        try:
+            with open(self._log_path(solver or self.racers[0])) as f:
+                return f.read()
+        except FileNotFoundError:
+            return ''
+
+    def poll(self):
+        # Collect the worker's answer once it is there; True when the job is over
+        if self._result is None and not self.cancelled:
+            if self._connection.poll():
+                self._result = self._connection.recv()
+            elif not self.process.is_alive():
+                self._result = {'error': f'Solver process exited with code {self.process.exitcode}'}
+            if self._result is not None:
+                self.finished = time.perf_counter()
+                self.process.join()
+        return self._result is not None or self.cancelled
+
+    def progress(self):
+        # Status ('running', 'finished', 'failed' or 'cancelled'), seconds elapsed, incumbent, bound and gap
+        done = self.poll()
+        # Best incumbent and bound over the racers (the hub model minimizes); a sweep has neither
+        if self.method == 'benders':
+            found = [parse_progress('benders', self.log())]
+        else:
+            found = [parse_progress(solver, self.log(solver)) for solver in self.racers if self.method == 'milp']
+        incumbent = min((value for value, _ in found if value is not None), default=None)
+        bound = max((value for _, value in found if value is not None), default=None)
+        if self._result is not None and 'objective' in self._result:
+            incumbent = self._result['objective']
+            if self._result['bound'] is not None:
+                bound = self._result['bound']
+        if self.cancelled:
+            status = 'cancelled'
+        elif not done:
+            status = 'running'
+        else:
+            status = 'failed' if 'error' in self._result else 'finished'
+        gap = abs(incumbent - bound) / max(abs(incumbent), 1e-12) if incumbent is not None and bound is not None else None
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return {'status': status, 'seconds': elapsed, 'incumbent': incumbent, 'bound': bound, 'gap': gap}
+
+    def result(self):
+        # The worker's answer: objective, allocation_plan, open_hubs, termination, bound, seconds, model size ...,
+        # the sweep table and seconds for method='sweep', or error
+        self.poll()
+        return self._result
+
+    def cancel(self):
+        # Stop the worker and the solver it started; the job reports 'cancelled'
+        if self.process is None or self.poll():
+            return
+        self.cancelled = True
+        self.finished = time.perf_counter()
+        try:
+            os.killpg(self.process.pid, signal.SIGTERM)
+        except (AttributeError, ProcessLookupError, PermissionError):
+            # No process groups (Windows) or the worker has not called setsid yet
+            self.process.terminate()
+        self.process.join(timeout=5)
@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+
+from hub_evaluate import best_pair_costs
+
+# solver_race.py lives in the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from solver_race import configure_solver
+
+
+def optimality_cuts(costs, mask, pair_batch=100_000):
+    """Subproblem values and Benders optimality cuts for every OD pair at the hub mask.
+
+    For fixed y each OD pair is an independent LP whose optimum u is the
+    cheapest open (k, m). With b the cheapest open leg of a node, its dual gives
+        eta[r] >= u[r] - sum_h coef[r, h] * y[h]
+        coef[r, h] = (u - a[i, h] - b[j])+ + (u - b[i] - a[j, h])+   for closed h
+    which reduces to the p-median cut of each leg when i and j prefer different
+    hubs. Returned as u (pairs,) and coef (pairs x H), computed in batches of pairs.
+    """
+    u, best_open = best_pair_costs(costs, mask)
+    leg = costs.leg.astype(float)
+    closed = ~mask
+
+    coef = np.zeros((len(u), len(costs.hubs)))
+    for start in range(0, len(u), pair_batch):
+        rows = slice(start, start + pair_batch)
+        i = costs.pair_origin[rows]
+        j = costs.pair_destination[rows]
+        value = u[rows, None]
+        first_leg = np.maximum(0.0, value - leg[i] - best_open[j, None])
+        second_leg = np.maximum(0.0, value - best_open[i, None] - leg[j])
+        coef[rows] = (first_leg + second_leg) * closed
+    return u, coef
+
+
+def _initial_mask(costs, p):
+    # Open the p hubs with the lowest total leg cost as the first trial point
+    mask = np.zeros(len(costs.hubs), dtype=bool)
+    mask[np.argsort(costs.leg.sum(axis=0), kind='stable')[:p]] = True
+    return mask
+
+
+def aggregate_cuts(costs, u, coef, cuts):
+    # 'pair' keeps one cut per OD pair, 'origin' sums the cuts of all pairs leaving a node
+    if cuts == 'pair':
+        return u, coef
+    starts = np.arange(0, len(u), len(costs.nodes) - 1)
+    return np.add.reduceat(u, starts), np.add.reduceat(coef, starts, axis=0)
+
+
+def build_master(costs, p, cuts='origin'):
+    # Master problem: only the hub decisions y, the p-hub constraint and one eta per cut group
+    model = pyo.ConcreteModel()
+    model.hubs = pyo.Set(initialize=costs.hubs)
+
+    model.y = pyo.Var(model.hubs, within=pyo.Binary)
+
+    # Each OD pair costs at least its cheapest (k, m) over all hubs
+    floor = costs.pair_costs().min(axis=1)
+    if cuts == 'origin':
+        floor = np.add.reduceat(floor, np.arange(0, len(floor), len(costs.nodes) - 1))
+    model.groups = pyo.RangeSet(0, len(floor) - 1)
+    model.eta = pyo.Var(model.groups, bounds=lambda model, r: (floor[r], None))
+
+    model.obj = pyo.Objective(expr=sum(model.eta[r] for r in model.groups), sense=pyo.minimize)
+
+    def total_hubs_constraint(model):
+        return sum(model.y[k] for k in model.hubs) == p
+
+    model.total_hubs_constraint = pyo.Constraint(rule=total_hubs_constraint)
+
+    model.cuts = pyo.ConstraintList()
+    return model
+
+
+def benders(costs, p, solver='glpk', cuts='origin', tol=1e-6, max_iterations=200, time_limit=None, pair_batch=100_000,
+            callback=None):
+    """Benders decomposition of the p-hub multiple-allocation model.
+
+    The master keeps y and the p-hub constraint; all OD-pair subproblems are
+    solved in closed form for the master's hub set and return their cuts as
+    arrays. `cuts='origin'` adds one aggregated cut per origin node and keeps
+    the master small, `cuts='pair'` adds one per OD pair (multi-cut). Only
+    cuts violated by the current master solution are added.
+
+    The search stops at a relative gap of `tol`, after `time_limit` seconds
+    (each master solve gets the time that is left) or `max_iterations`. A
+    master stopped by the limit gives no valid bound, so the search ends
+    there with the best hub set found. `callback(progress)` is called with
+    every history row; returning True stops the search.
+
+    Returns (objective value, open hubs, history) where history has one row per
+    iteration with the lower bound, upper bound, relative gap, cuts added and
+    elapsed seconds.
+    """
+    if not 2 <= p <= len(costs.hubs):
+        raise ValueError(f'p must be between 2 and {len(costs.hubs)}, got {p}')
+
+    start = time.perf_counter()
+    master = build_master(costs, p, cuts)
+
+    mask = _initial_mask(costs, p)
+    eta = None
+    lower_bound, upper_bound, best_mask = -np.inf, np.inf, mask
+    history = []
+
+    for iteration in range(1, max_iterations + 1):
+        # Subproblems for the current hub set, all OD pairs at once
+        u, coef = optimality_cuts(costs, mask, pair_batch)
+        if u.sum() < upper_bound:
+            upper_bound, best_mask = float(u.sum()), mask
+        u, coef = aggregate_cuts(costs, u, coef, cuts)
+
+        # Cuts are tight at the hub set they came from, so eta < u means violated
+        violated = np.arange(len(u)) if eta is None else np.flatnonzero(eta < u - 1e-9)
+        for r in violated:
+            closed = np.flatnonzero(coef[r])
+            master.cuts.add(master.eta[int(r)] + sum(coef[r, h] * master.y[costs.hubs[h]] for h in closed) >= u[r])
+
+        # Master problem gives the next hub set and a valid lower bound, if solved to optimality
+        remaining = None if time_limit is None else max(time_limit - (time.perf_counter() - start), 1.0)
+        results = configure_solver(solver, remaining).solve(master, load_solutions=False)
+        if str(results.solver.termination_condition) != 'optimal':
+            break
+        master.solutions.load_from(results)
+        lower_bound = max(lower_bound, pyo.value(master.obj))
+        mask = np.array([pyo.value(master.y[k]) > 0.5 for k in costs.hubs])
+        eta = np.array([pyo.value(master.eta[r]) for r in master.groups])
+
+        gap = (upper_bound - lower_bound) / max(abs(upper_bound), 1e-12)
+        elapsed = time.perf_counter() - start
+        history.append({'Iteration': iteration, 'Lower Bound': lower_bound, 'Upper Bound': upper_bound,
+                        'Gap': gap, 'Cuts Added': len(violated), 'Seconds': elapsed})
+        stop = callback is not None and callback(history[-1])
+
+        if stop or gap <= tol or (time_limit is not None and elapsed >= time_limit):
+            break
+
+    open_hubs = [hub for hub, is_open in zip(costs.hubs, best_mask) if is_open]
+    return upper_bound, open_hubs, pd.DataFrame(history)
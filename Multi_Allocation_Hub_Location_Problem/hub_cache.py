@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+from hub_cost import matrix_key
+
+# Outside the repository, shared by every app session on this machine
+CACHE_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'multi_hub_solves')
+
+# Least recently used entries are dropped beyond either limit
+MAX_ENTRIES = 200
+MAX_BYTES = 500 * 1024 ** 2
+
+
+def solve_key(cost_df, p, formulation, **options):
+    """Content hash of one solve: the cost matrix, p, the formulation and the solver options.
+
+    The matrix is normalized to string labels and float values first, so the
+    same costs hash alike whether they came from Excel or from the data
+    editor (int or float columns), while any edited cell or label changes
+    the key. Options are hashed by name, in any order.
+    """
+    normalized = cost_df.astype(float)
+    normalized.index = normalized.index.map(str)
+    normalized.columns = normalized.columns.map(str)
+    payload = {'matrix': matrix_key(normalized), 'p': int(p), 'formulation': formulation, 'options': options}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SolveCache:
+    """Solve results on disk, one pickle per key, least recently used evicted first.
+
+    get() touches the file it reads, so modification times order the
+    entries by last use. put() writes through a temporary file and a rename,
+    so a reader never sees half an entry, then evicts the oldest entries
+    beyond `max_entries` files or `max_bytes` in total. Entries are pickles:
+    only point `directory` at a location you trust.
+    """
+
+    def __init__(self, directory=CACHE_DIRECTORY, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def get(self, key):
+        # The stored entry, or None on a miss
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Unreadable, e.g. written by other pandas versions: treat as a miss and drop it
+            self._remove(path)
+            return None
+        os.utime(path)
+        return entry
+
+    def put(self, key, entry):
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, self._path(key))
+        self.evict()
+
+    def entries(self):
+        # (path, bytes, last use) of every entry, most recently used first
+        found = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                found.append((path, stat.st_size, stat.st_mtime))
+        return sorted(found, key=lambda item: item[2], reverse=True)
+
+    def evict(self):
+        total = 0
+        for position, (path, size, _) in enumerate(self.entries()):
+            total += size
+            if position >= self.max_entries or total > self.max_bytes:
+                self._remove(path)
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        # Another session may have evicted it first
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,70 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+def load_cost_matrix(source):
+    # Read the node x hub cost matrix, node labels become the index
+    cost_df = pd.read_excel(source)
+    cost_df.set_index('Unnamed: 0', inplace=True)
+    return cost_df
+
+
+def random_cost_matrix(n_nodes, n_hubs, seed=0, low=10, high=45):
+    # Seeded synthetic matrix shaped like cost_matrix_multi_hub.xlsx
+    rng = np.random.default_rng(seed)
+    data = rng.integers(low, high + 1, size=(n_nodes, n_hubs))
+    nodes = [f'N{i + 1}' for i in range(n_nodes)]
+    hubs = [f'Hub{k + 1}' for k in range(n_hubs)]
+    return pd.DataFrame(data, index=pd.Index(nodes, name='Unnamed: 0'), columns=hubs)
+
+
+def matrix_key(cost_df):
+    # Content hash of the labels and values, stable across reruns and processes
+    digest = hashlib.sha1()
+    digest.update(repr((list(cost_df.index), list(cost_df.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(cost_df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class HubCosts:
+    """Combined costs c(i, k, m, j) = a[i, k] + a[j, m] held as integer-indexed arrays.
+
+    Node and hub labels are mapped to positions once. `leg` keeps the n x H
+    matrix a, and the pair/hub-pair index arrays follow the ordering of the
+    `pairs` and `hub_pairs` lists used by the Pyomo model, so row `r` of
+    `pair_costs()` belongs to `pairs[r]` and column `s` to `hub_pairs[s]`.
+    """
+
+    def __init__(self, cost_df):
+        self.nodes = list(cost_df.index)
+        self.hubs = list(cost_df.columns)
+        self.node_index = {node: n for n, node in enumerate(self.nodes)}
+        self.hub_index = {hub: h for h, hub in enumerate(self.hubs)}
+        self.leg = cost_df.to_numpy()
+
+        n_nodes, n_hubs = self.leg.shape
+        self.pair_origin, self.pair_destination = np.nonzero(~np.eye(n_nodes, dtype=bool))
+        self.first_hub, self.second_hub = np.nonzero(~np.eye(n_hubs, dtype=bool))
+
+        self.pairs = [(self.nodes[i], self.nodes[j]) for i, j in zip(self.pair_origin, self.pair_destination)]
+        self.hub_pairs = [(self.hubs[k], self.hubs[m]) for k, m in zip(self.first_hub, self.second_hub)]
+
+    def cost(self, i, k, m, j):
+        # Label lookup with the same signature as the old cost[(i, k, m, j)] dict
+        return self.leg[self.node_index[i], self.hub_index[k]] + self.leg[self.node_index[j], self.hub_index[m]]
+
+    def pair_costs(self):
+        # len(pairs) x len(hub_pairs) matrix: origin leg first, then the destination
+        # leg added one origin block at a time so only a single full-size array exists
+        out = self.leg[np.ix_(self.pair_origin, self.first_hub)]
+        block = len(self.nodes) - 1
+        for start in range(0, len(out), block):
+            destinations = self.pair_destination[start:start + block]
+            out[start:start + block] += self.leg[np.ix_(destinations, self.second_hub)]
+        return out
+
+    def tensor(self):
+        # Dense c[i, k, m, j] over every label position (diagonals included)
+        return self.leg[:, :, None, None] + self.leg.T[None, None, :, :]
@@ -0,0 +1,118 @@
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# Keep each evaluation batch to roughly this many (hub set, origin, destination) cells
+BATCH_CELLS = 4_000_000
+
+
+def hub_set_masks(costs, hub_sets):
+    # Boolean (number of sets) x H matrix from lists of hub labels
+    masks = np.zeros((len(hub_sets), len(costs.hubs)), dtype=bool)
+    for row, hub_set in enumerate(hub_sets):
+        masks[row, [costs.hub_index[hub] for hub in hub_set]] = True
+    return masks
+
+
+def _two_cheapest(costs, masks):
+    # Cheapest and second cheapest open hub for every node, per hub set
+    leg = np.where(masks[:, None, :], costs.leg[None, :, :].astype(float), np.inf)
+    order = np.argpartition(leg, 1, axis=2)[:, :, :2]
+    return order, np.take_along_axis(leg, order, axis=2)
+
+
+def _pair_matrix(order, values):
+    # Closed-form best c(i, k, m, j) with k != m for every (i, j), per hub set.
+    # If i and j prefer different hubs both take their cheapest, otherwise one
+    # side falls back to its second cheapest hub.
+    best_hub = order[:, :, 0]
+    best = values[:, :, 0]
+    second = values[:, :, 1]
+    distinct = best_hub[:, :, None] != best_hub[:, None, :]
+    together = best[:, :, None] + best[:, None, :]
+    fallback = np.minimum(best[:, :, None] + second[:, None, :], second[:, :, None] + best[:, None, :])
+    return np.where(distinct, together, fallback)
+
+
+def evaluate_hub_sets(costs, masks):
+    """Total cost of the optimal allocation for each open hub set in `masks`.
+
+    `masks` is a (number of sets) x H boolean matrix with at least two open
+    hubs per row. Without capacities every OD pair independently takes its
+    cheapest k != m among the open hubs, so no solver is needed.
+    """
+    n_nodes = len(costs.nodes)
+    batch = max(1, BATCH_CELLS // (n_nodes * n_nodes))
+    off_diagonal = ~np.eye(n_nodes, dtype=bool)
+
+    totals = np.empty(len(masks))
+    for start in range(0, len(masks), batch):
+        order, values = _two_cheapest(costs, masks[start:start + batch])
+        pair_cost = _pair_matrix(order, values)
+        totals[start:start + batch] = pair_cost[:, off_diagonal].sum(axis=1)
+    return totals
+
+
+def best_pair_costs(costs, mask):
+    # Optimal cost of every OD pair (in costs.pairs order) for a single open hub mask
+    order, values = _two_cheapest(costs, mask[None, :])
+    pair_cost = _pair_matrix(order, values)[0]
+    return pair_cost[costs.pair_origin, costs.pair_destination], values[0, :, 0]
+
+
+def allocate(costs, open_hubs):
+    # Objective value and allocation plan table for one open hub set
+    order, values = _two_cheapest(costs, hub_set_masks(costs, [open_hubs]))
+    best_hub, second_hub = order[0, :, 0], order[0, :, 1]
+    best, second = values[0, :, 0], values[0, :, 1]
+
+    i, j = costs.pair_origin, costs.pair_destination
+    first = best_hub[i].copy()
+    last = best_hub[j].copy()
+
+    clash = first == last
+    origin_moves = best[i] + second[j] > second[i] + best[j]
+    first[clash & origin_moves] = second_hub[i][clash & origin_moves]
+    last[clash & ~origin_moves] = second_hub[j][clash & ~origin_moves]
+
+    pair_cost = costs.leg[i, first] + costs.leg[j, last]
+    allocation_plan = pd.DataFrame({
+        'Origin': [costs.nodes[n] for n in i],
+        'Destination': [costs.nodes[n] for n in j],
+        'First Hub': [costs.hubs[h] for h in first],
+        'Second Hub': [costs.hubs[h] for h in last],
+        'Allocation': 1.0,
+    })
+    return float(pair_cost.sum()), allocation_plan
+
+
+def enumerate_hub_sets(costs, p, batch_size=50_000):
+    """Proven optimum over all C(H, p) open hub sets, scored in batches.
+
+    Returns the objective value and the open hubs of the first best set in
+    lexicographic order, together with the number of sets evaluated.
+    """
+    n_hubs = len(costs.hubs)
+    if not 2 <= p <= n_hubs:
+        raise ValueError(f'p must be between 2 and {n_hubs}, got {p}')
+
+    combinations = itertools.combinations(range(n_hubs), p)
+    best_value, best_set = math.inf, None
+    evaluated = 0
+    while True:
+        chunk = np.array(list(itertools.islice(combinations, batch_size)), dtype=int)
+        if len(chunk) == 0:
+            break
+        masks = np.zeros((len(chunk), n_hubs), dtype=bool)
+        np.put_along_axis(masks, chunk, True, axis=1)
+
+        totals = evaluate_hub_sets(costs, masks)
+        row = int(np.argmin(totals))
+        if totals[row] < best_value:
+            best_value, best_set = float(totals[row]), chunk[row]
+        evaluated += len(chunk)
+
+    return best_value, [costs.hubs[h] for h in best_set], evaluated
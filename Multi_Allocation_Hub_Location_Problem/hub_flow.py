@@ -0,0 +1,151 @@
+import numpy as np
+import pyomo.environ as pyo
+
+from hub_model import allocation_frame
+
+
+def build_flow_model(costs, p):
+    """Compact flow formulation of the hub model (Ernst and Krishnamoorthy style).
+
+    Instead of a binary per path, every origin i ships one unit to each other
+    node through three layers of continuous flows: origin_flow[i, k] from i
+    to its first hub, hub_flow[i, k, m] from the first to a different second
+    hub, and destination_flow[i, m, j] from the second hub to j. Path cost
+    a[i, k] + a[j, m] splits into the first and last leg, so the objective
+    needs no inter-hub term. Only y is binary: for fixed open hubs the flows
+    are an uncapacitated network flow, integral at the optimum, which gives
+    the path formulation's optimum with O(n h^2 + n^2 h) variables and
+    O(n^2 + n h) constraints instead of O(n^2 h^2) and O(n^2 h).
+    """
+    nodes, hubs = costs.nodes, costs.hubs
+    n_nodes, n_hubs = costs.leg.shape
+    supply = n_nodes - 1  # destinations per origin
+
+    # Index lists in construction order, read back as arrays by extract_flow_allocation
+    first_legs = [(i, k) for i in nodes for k in hubs]
+    hub_legs = [(i, k, m) for i in nodes for k, m in costs.hub_pairs]
+    last_legs = [(i, m, j) for i in nodes for m in hubs for j in nodes if j != i]
+
+    # Initialize the model
+    model = pyo.ConcreteModel()
+
+    # Define sets
+    model.nodes = pyo.Set(initialize=nodes)
+    model.hubs = pyo.Set(initialize=hubs)
+    model.pairs = pyo.Set(initialize=costs.pairs, dimen=2)
+    model.first_legs = pyo.Set(initialize=first_legs, dimen=2)
+    model.hub_legs = pyo.Set(initialize=hub_legs, dimen=3)
+    model.last_legs = pyo.Set(initialize=last_legs, dimen=3)
+
+    # Number of hubs to open, mutable as in build_model
+    model.p = pyo.Param(initialize=p, mutable=True, within=pyo.PositiveIntegers)
+
+    # Decision Variables
+    model.origin_flow = pyo.Var(model.first_legs, within=pyo.NonNegativeReals)
+    model.hub_flow = pyo.Var(model.hub_legs, within=pyo.NonNegativeReals)
+    model.destination_flow = pyo.Var(model.last_legs, within=pyo.NonNegativeReals)
+    model.y = pyo.Var(model.hubs, within=pyo.Binary)
+
+    # Objective function: first leg cost per unit leaving i, last leg cost per unit reaching j
+    leg_cost = costs.leg.tolist()
+    node_index, hub_index = costs.node_index, costs.hub_index
+    model.obj = pyo.Objective(
+        expr=sum(leg_cost[node_index[i]][hub_index[k]] * model.origin_flow[i, k] for i, k in first_legs)
+        + sum(leg_cost[node_index[j]][hub_index[m]] * model.destination_flow[i, m, j] for i, m, j in last_legs),
+        sense=pyo.minimize)
+
+    # Flows in and out of each layer, per origin
+    out_of_hub = {key: [] for key in first_legs}
+    into_hub = {key: [] for key in first_legs}
+    for i, k, m in hub_legs:
+        out_of_hub[i, k].append(m)
+        into_hub[i, m].append(k)
+    to_destinations = {key: [] for key in first_legs}
+    for i, m, j in last_legs:
+        to_destinations[i, m].append(j)
+
+    # Constraints
+    # Total hubs constraint
+    model.total_hubs_constraint = pyo.Constraint(expr=sum(model.y[k] for k in model.hubs) == model.p)
+
+    # Every origin sends one unit per destination
+    def supply_constraint(model, i):
+        return sum(model.origin_flow[i, k] for k in hubs) == supply
+
+    model.supply_constraint = pyo.Constraint(model.nodes, rule=supply_constraint)
+
+    # Every destination receives its unit from some second hub
+    def demand_constraint(model, i, j):
+        return sum(model.destination_flow[i, m, j] for m in hubs) == 1
+
+    model.demand_constraint = pyo.Constraint(model.pairs, rule=demand_constraint)
+
+    # All flow reaching a first hub moves on to a different hub
+    def first_hub_balance(model, i, k):
+        return model.origin_flow[i, k] == sum(model.hub_flow[i, k, m] for m in out_of_hub[i, k])
+
+    model.first_hub_balance = pyo.Constraint(model.first_legs, rule=first_hub_balance)
+
+    # All flow reaching a second hub leaves for the destinations
+    def second_hub_balance(model, i, m):
+        return sum(model.hub_flow[i, k, m] for k in into_hub[i, m]) == sum(model.destination_flow[i, m, j] for j in to_destinations[i, m])
+
+    model.second_hub_balance = pyo.Constraint(model.first_legs, rule=second_hub_balance)
+
+    # Flow only through open hubs
+    def first_hub_open(model, i, k):
+        return model.origin_flow[i, k] <= supply * model.y[k]
+
+    model.first_hub_open = pyo.Constraint(model.first_legs, rule=first_hub_open)
+
+    def second_hub_open(model, i, m):
+        return sum(model.destination_flow[i, m, j] for j in to_destinations[i, m]) <= supply * model.y[m]
+
+    model.second_hub_open = pyo.Constraint(model.first_legs, rule=second_hub_open)
+    return model
+
+
+def _values(var, shape):
+    # All values of a variable in construction order, reshaped
+    values = var.extract_values()
+    return np.nan_to_num(np.fromiter(values.values(), dtype=float, count=len(values))).reshape(shape)
+
+
+def extract_flow_allocation(model, costs, tol=1e-6):
+    """Objective value and allocation plan of a solved flow model.
+
+    The flows of each origin are decomposed into paths: the units reaching
+    second hub m are matched, destination by destination, to the units that
+    entered from each first hub k. Returns the same table as
+    hub_model.extract_allocation, with fractional Allocation only if the
+    solver returned split flows.
+    """
+    n_nodes, n_hubs = costs.leg.shape
+    hub_flow = np.zeros((n_nodes, n_hubs, n_hubs))
+    hub_flow[:, costs.first_hub, costs.second_hub] = _values(model.hub_flow, (n_nodes, len(costs.hub_pairs)))
+    destination_flow = _values(model.destination_flow, (n_nodes, n_hubs, n_nodes - 1))
+
+    # Hub pair position of (k, m), and pair position of (i, j) given i and the j-th other node
+    hub_pair_position = np.full((n_hubs, n_hubs), -1)
+    hub_pair_position[costs.first_hub, costs.second_hub] = np.arange(len(costs.hub_pairs))
+
+    pair, hub_pair, allocation = [], [], []
+    for i in range(n_nodes):
+        for m in range(n_hubs):
+            sources = [[k, amount] for k, amount in enumerate(hub_flow[i, :, m]) if amount > tol]
+            for other in np.flatnonzero(destination_flow[i, m] > tol):
+                need = destination_flow[i, m, other]
+                while need > tol and sources:
+                    k, amount = sources[0]
+                    used = min(need, amount)
+                    pair.append(i * (n_nodes - 1) + other)
+                    hub_pair.append(hub_pair_position[k, m])
+                    allocation.append(used)
+                    need -= used
+                    sources[0][1] -= used
+                    if sources[0][1] <= tol:
+                        sources.pop(0)
+
+    allocation_plan = allocation_frame(costs.pairs, costs.hub_pairs, np.array(pair, dtype=np.int64),
+                                       np.array(hub_pair, dtype=np.int64), np.array(allocation))
+    return pyo.value(model.obj), allocation_plan
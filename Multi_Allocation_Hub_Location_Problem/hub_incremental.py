@@ -0,0 +1,99 @@
+import numpy as np
+from pyomo.contrib.appsi.solvers import Highs
+
+from hub_model import build_model, extract_allocation
+
+
+def changed_paths(costs, leg):
+    """Positions (pair, hub pair) of the path costs that change when the leg matrix a becomes `leg`.
+
+    A cell a[n, h] only enters the paths that leave node n through first
+    hub h and those that reach node n from second hub h, so every edited
+    cell touches (nodes - 1) x (hubs - 1) paths per side instead of the
+    whole pairs x hub pairs matrix. Returns (pair positions, hub pair
+    positions, changed cells) with every path listed once.
+    """
+    changed_nodes, changed_hubs = np.nonzero(costs.leg.astype(float) != np.asarray(leg, dtype=float))
+    positions = []
+    for n, h in zip(changed_nodes.tolist(), changed_hubs.tolist()):
+        for pair_node, hub in [(costs.pair_origin, costs.first_hub), (costs.pair_destination, costs.second_hub)]:
+            rows, columns = np.flatnonzero(pair_node == n), np.flatnonzero(hub == h)
+            positions.append((rows[:, None] * len(costs.hub_pairs) + columns[None, :]).ravel())
+    flat = np.unique(np.concatenate(positions)) if positions else np.zeros(0, dtype=int)
+    pair, hub_pair = np.divmod(flat, len(costs.hub_pairs))
+    return pair, hub_pair, len(changed_nodes)
+
+
+class IncrementalHub:
+    """Path model and HiGHS instance kept alive between what-if edits of one cost matrix.
+
+    The model is built once with mutable path costs (build_model with
+    mutable_costs=True) and handed to a persistent appsi HiGHS solver.
+    update() diffs an edited HubCosts against the current one, sets only the
+    affected cost parameters and p, and the next solve() passes the new
+    coefficients to the solver already holding the model, which starts from
+    the previous incumbent. No Pyomo expressions are rebuilt and no model
+    file is written. A matrix with other node or hub labels needs a new
+    IncrementalHub, see matches().
+    """
+
+    def __init__(self, costs, p):
+        self.costs = costs
+        self.model = build_model(costs, p, mutable_costs=True)
+        self.solver = Highs()
+
+        # Only parameter values change once the model is loaded, and update() passes them on itself,
+        # so a solve skips the solver's scans of the model for new or modified components
+        update = self.solver.update_config
+        update.check_for_new_or_removed_constraints = False
+        update.check_for_new_or_removed_vars = False
+        update.check_for_new_or_removed_params = False
+        update.check_for_new_objective = False
+        update.update_constraints = False
+        update.update_vars = False
+        update.update_params = False
+        update.update_named_expressions = False
+        update.update_objective = False
+
+        # The last solution (still in the model's variables) is passed to HiGHS as a MIP start
+        self.solver.config.warmstart = True
+        self.solver.config.load_solution = False
+        self.solver.set_instance(self.model)
+
+    def matches(self, costs):
+        # Same node and hub labels, so the model's sets and constraints still hold
+        return costs.nodes == self.costs.nodes and costs.hubs == self.costs.hubs
+
+    def update(self, costs, p):
+        # Set the path costs that differ from the current matrix; returns (changed cells, changed coefficients)
+        pair, hub_pair, cells = changed_paths(self.costs, costs.leg)
+        values = (costs.leg[costs.pair_origin[pair], costs.first_hub[hub_pair]]
+                  + costs.leg[costs.pair_destination[pair], costs.second_hub[hub_pair]]).tolist()
+        for r, s, value in zip(pair.tolist(), hub_pair.tolist(), values):
+            self.model.c[costs.pairs[r] + costs.hub_pairs[s]] = value
+        self.model.p = p
+        self.costs = costs
+
+        # New objective coefficients and p right-hand side into the HiGHS model
+        self.solver.update_params()
+        return cells, len(values)
+
+    def solve(self, time_limit=None, mip_gap=None):
+        """Solve the model as it stands, from the previous solution after the first call.
+
+        Returns (objective value, allocation plan, open hubs, termination);
+        the objective and plan are None when no feasible solution was found
+        within `time_limit`.
+        """
+        self.solver.config.time_limit = time_limit
+        self.solver.config.mip_gap = mip_gap
+        results = self.solver.solve(self.model)
+
+        termination = results.termination_condition.name
+        if results.best_feasible_objective is None:
+            return None, None, [], termination
+        results.solution_loader.load_vars()
+
+        objective_value, allocation_plan = extract_allocation(self.model, self.costs)
+        open_hubs = [hub for hub, value in self.model.y.extract_values().items() if value is not None and value > 0.5]
+        return objective_value, allocation_plan, open_hubs, termination
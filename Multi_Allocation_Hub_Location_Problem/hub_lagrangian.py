@@ -0,0 +1,110 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from hub_evaluate import evaluate_hub_sets
+
+
+def _cheapest_distinct(origin_leg, destination_leg):
+    # Row-wise min over k != m of origin_leg[r, k] + destination_leg[r, m], with the argmins
+    rows = np.arange(len(origin_leg))
+    k_order = np.argpartition(origin_leg, 1, axis=1)[:, :2]
+    m_order = np.argpartition(destination_leg, 1, axis=1)[:, :2]
+    k_values = np.take_along_axis(origin_leg, k_order, axis=1)
+    m_values = np.take_along_axis(destination_leg, m_order, axis=1)
+
+    k, m = k_order[:, 0].copy(), m_order[:, 0].copy()
+    value = k_values[:, 0] + m_values[:, 0]
+
+    clash = k == m
+    move_first = k_values[:, 1] + m_values[:, 0] < k_values[:, 0] + m_values[:, 1]
+    k[clash & move_first] = k_order[clash & move_first, 1]
+    m[clash & ~move_first] = m_order[clash & ~move_first, 1]
+    value[clash] = origin_leg[rows[clash], k[clash]] + destination_leg[rows[clash], m[clash]]
+    return k, m, value
+
+
+def _top_hubs(weight, p):
+    # Mask of the p hubs with the largest weight
+    mask = np.zeros(len(weight), dtype=bool)
+    mask[np.argsort(-weight, kind='stable')[:p]] = True
+    return mask
+
+
+def lagrangian(costs, p, time_limit=10.0, max_iterations=2000, step=2.0, patience=20, tol=1e-4):
+    """Lagrangian bound and heuristic hub plan for the p-hub multiple-allocation model.
+
+    flow_constraint_a / flow_constraint_b are relaxed with multipliers
+    lam[(i, j), k] and mu[(i, j), m] >= 0. The relaxed problem splits into a
+    cheapest k != m per OD pair under penalised costs and a choice of the p hubs
+    with the largest total multiplier, so each iteration is a few array passes.
+    Multipliers follow a Polyak subgradient step whose scale halves after
+    `patience` iterations without a better bound. Every iteration repairs a
+    primal solution by reallocating all OD pairs optimally to the relaxed hub
+    set and to the hubs the relaxed x uses most.
+
+    Returns (objective value, open hubs, lower bound, history). The lower bound
+    certifies the solution: its relative gap is in the last history row.
+    """
+    if not 2 <= p <= len(costs.hubs):
+        raise ValueError(f'p must be between 2 and {len(costs.hubs)}, got {p}')
+
+    start = time.perf_counter()
+    n_hubs = len(costs.hubs)
+    leg = costs.leg.astype(float)
+    origin_leg = leg[costs.pair_origin]
+    destination_leg = leg[costs.pair_destination]
+    rows = np.arange(len(costs.pairs))
+
+    lam = np.zeros_like(origin_leg)
+    mu = np.zeros_like(destination_leg)
+
+    lower_bound, upper_bound, best_mask = -np.inf, np.inf, None
+    scale, stalled = step, 0
+    history = []
+
+    for iteration in range(1, max_iterations + 1):
+        # Relaxed problem: x per OD pair, y as the p hubs with the largest multiplier weight
+        k, m, pair_value = _cheapest_distinct(origin_leg + lam, destination_leg + mu)
+        hub_weight = lam.sum(axis=0) + mu.sum(axis=0)
+        mask = _top_hubs(hub_weight, p)
+        bound = pair_value.sum() - hub_weight[mask].sum()
+
+        if bound > lower_bound + 1e-9:
+            lower_bound, stalled = bound, 0
+        else:
+            stalled += 1
+            if stalled >= patience:
+                scale, stalled = scale / 2, 0
+
+        # Primal repair: optimal allocation to the relaxed hub set and to the most used hubs
+        usage = np.bincount(k, minlength=n_hubs) + np.bincount(m, minlength=n_hubs)
+        candidates = np.array([mask, _top_hubs(usage.astype(float), p)])
+        totals = evaluate_hub_sets(costs, candidates)
+        if totals.min() < upper_bound:
+            upper_bound, best_mask = float(totals.min()), candidates[np.argmin(totals)]
+
+        gap = (upper_bound - lower_bound) / max(abs(upper_bound), 1e-12)
+        elapsed = time.perf_counter() - start
+        history.append({'Iteration': iteration, 'Lower Bound': lower_bound, 'Upper Bound': upper_bound,
+                        'Gap': gap, 'Step Scale': scale, 'Seconds': elapsed})
+        if gap <= tol or elapsed >= time_limit:
+            break
+
+        # Subgradient of the relaxed constraints sum_m x - y[k] <= 0 and sum_k x - y[m] <= 0
+        y = mask.astype(float)
+        lam_grad = np.broadcast_to(-y, lam.shape).copy()
+        lam_grad[rows, k] += 1.0
+        mu_grad = np.broadcast_to(-y, mu.shape).copy()
+        mu_grad[rows, m] += 1.0
+
+        norm = (lam_grad ** 2).sum() + (mu_grad ** 2).sum()
+        if norm == 0:
+            break
+        t = scale * (upper_bound - bound) / norm
+        lam = np.maximum(0.0, lam + t * lam_grad)
+        mu = np.maximum(0.0, mu + t * mu_grad)
+
+    open_hubs = [hub for hub, is_open in zip(costs.hubs, best_mask) if is_open]
+    return upper_bound, open_hubs, lower_bound, pd.DataFrame(history)
@@ -0,0 +1,248 @@
+from contextlib import ExitStack
+
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+
+from hub_prune import surviving_paths
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # only Parquet export needs pyarrow, CSV works without it
+    pa = pq = None
+
+
+# Rows per chunk when writing an allocation plan
+CHUNK_ROWS = 100_000
+
+
+def build_model(costs, p, prune=False, mutable_costs=False):
+    # Path formulation: x[(i, j), (k, m)] = 1 when OD pair (i, j) travels via hub k then hub m.
+    # With mutable_costs the path costs are a mutable parameter c, see hub_incremental
+    pairs = costs.pairs
+    hub_pairs = costs.hub_pairs
+    hubs = costs.hubs
+
+    # Initialize the model
+    model = pyo.ConcreteModel()
+
+    # Define sets
+    model.pairs = pyo.Set(initialize=pairs, dimen=2)
+    model.hub_pairs = pyo.Set(initialize=hub_pairs, dimen=2)
+    model.hubs = pyo.Set(initialize=hubs)
+
+    # Number of hubs to open, mutable so one model can be re-solved for other p
+    model.p = pyo.Param(initialize=p, mutable=True, within=pyo.PositiveIntegers)
+
+    if prune and mutable_costs:
+        raise ValueError('A pruned model only holds for the costs it was pruned with, mutable_costs needs prune=False')
+    if prune:
+        # x only for the paths that can be optimal with p or more open hubs
+        return _build_pruned(model, costs, p)
+
+    # Decision Variables
+    model.x = pyo.Var(model.pairs, model.hub_pairs, within=pyo.Binary)
+    model.y = pyo.Var(model.hubs, within=pyo.Binary)
+
+    # Objective function: Minimize total cost
+    pair_costs = costs.pair_costs().tolist()
+
+    if mutable_costs:
+        # Edited costs are new parameter values, the model and a persistent solver are updated in place
+        model.c = pyo.Param(model.pairs, model.hub_pairs, mutable=True,
+                            initialize={pair + hub_pair: pair_costs[a][b]
+                                        for a, pair in enumerate(pairs) for b, hub_pair in enumerate(hub_pairs)})
+        pair_costs = [[model.c[pair, hub_pair] for hub_pair in hub_pairs] for pair in pairs]
+
+    def objective_rule(model):
+        return sum(pair_costs[a][b] * model.x[pair, hub_pair]
+                   for a, pair in enumerate(pairs) for b, hub_pair in enumerate(hub_pairs))
+
+    model.obj = pyo.Objective(rule=objective_rule, sense=pyo.minimize)
+
+    # Constraints
+    # Total hubs constraint
+    def total_hubs_constraint(model):
+        return sum(model.y[k] for k in model.hubs) == model.p
+
+    model.total_hubs_constraint = pyo.Constraint(rule=total_hubs_constraint)
+
+    # Allocation constraint
+    def allocation_constraint(model, i, j):
+        return sum(model.x[(i, j), (k, m)] for (k, m) in model.hub_pairs) == 1
+
+    model.allocation_constraint = pyo.Constraint(model.pairs, rule=allocation_constraint)
+
+    # First flow constraint
+    def flow_constraint_a(model, i, j, k):
+        return sum(model.x[(i, j), (k, m)] for m in hubs if k != m) <= model.y[k]
+
+    model.flow_constraint_a = pyo.Constraint(pairs, hubs, rule=flow_constraint_a)
+
+    # Second flow constraint
+    def flow_constraint_b(model, i, j, m):
+        return sum(model.x[(i, j), (k, m)] for k in hubs if m != k) <= model.y[m]
+
+    model.flow_constraint_b = pyo.Constraint(pairs, hubs, rule=flow_constraint_b)
+
+    # Non-negativity and binary constraints are implicit in the variable definitions
+    return model
+
+
+def _build_pruned(model, costs, p):
+    # Same constraints as build_model, summed over the surviving paths only
+    pair, hub_pair = np.nonzero(surviving_paths(costs, p))
+    paths = [costs.pairs[r] + costs.hub_pairs[s] for r, s in zip(pair.tolist(), hub_pair.tolist())]
+
+    # Positions of the x variables in pairs x hub_pairs, read back by extract_allocation
+    model.kept_paths = (pair, hub_pair)
+
+    # Decision Variables
+    model.paths = pyo.Set(initialize=paths, dimen=4)
+    model.x = pyo.Var(model.paths, within=pyo.Binary)
+    model.y = pyo.Var(model.hubs, within=pyo.Binary)
+
+    # Objective function: Minimize total cost
+    path_costs = costs.pair_costs()[pair, hub_pair].tolist()
+    model.obj = pyo.Objective(expr=sum(cost * model.x[path] for cost, path in zip(path_costs, paths)), sense=pyo.minimize)
+
+    # Surviving hub pairs per OD pair, and per OD pair and first or second hub
+    by_pair, by_first, by_second = {}, {}, {}
+    for i, j, k, m in paths:
+        by_pair.setdefault((i, j), []).append((k, m))
+        by_first.setdefault((i, j, k), []).append(m)
+        by_second.setdefault((i, j, m), []).append(k)
+
+    # Total hubs constraint
+    model.total_hubs_constraint = pyo.Constraint(expr=sum(model.y[k] for k in model.hubs) == model.p)
+
+    # Allocation constraint, every pair keeps at least its optimal paths
+    def allocation_constraint(model, i, j):
+        return sum(model.x[(i, j), (k, m)] for (k, m) in by_pair[i, j]) == 1
+
+    model.allocation_constraint = pyo.Constraint(model.pairs, rule=allocation_constraint)
+
+    # Flow constraints, only where a path through the hub survives
+    def flow_constraint_a(model, i, j, k):
+        return sum(model.x[(i, j), (k, m)] for m in by_first[i, j, k]) <= model.y[k]
+
+    model.flow_constraint_a = pyo.Constraint(list(by_first), rule=flow_constraint_a)
+
+    def flow_constraint_b(model, i, j, m):
+        return sum(model.x[(i, j), (k, m)] for k in by_second[i, j, m]) <= model.y[m]
+
+    model.flow_constraint_b = pyo.Constraint(list(by_second), rule=flow_constraint_b)
+    return model
+
+
+def solution_arrays(var, n_columns, tol=1e-6, positions=None):
+    """Nonzero values of a solved variable indexed by rows x columns, as NumPy arrays.
+
+    All values are read in one extract_values() pass (in construction order,
+    row-major for model.x) instead of a value() call per index, and only the
+    entries above `tol` are kept. A variable over a subset of rows x columns
+    (a pruned model.x) passes the (row, column) `positions` of its indices in
+    construction order. Returns (row positions, column positions, values),
+    e.g. pair and hub pair positions for model.x.
+    """
+    values = var.extract_values()
+    values = np.fromiter(values.values(), dtype=float, count=len(values))  # unset values become NaN and are dropped
+    chosen = np.flatnonzero(np.abs(values) > tol)
+    if positions is not None:
+        return positions[0][chosen], positions[1][chosen], values[chosen]
+    row, column = np.divmod(chosen, n_columns)
+    return row, column, values[chosen]
+
+
+def _label_columns(index_pairs):
+    # First and second label of every (a, b) pair as object arrays, for vectorized lookups
+    first = np.empty(len(index_pairs), dtype=object)
+    second = np.empty(len(index_pairs), dtype=object)
+    first[:] = [a for a, b in index_pairs]
+    second[:] = [b for a, b in index_pairs]
+    return first, second
+
+
+def allocation_chunks(pairs, hub_pairs, pair, hub_pair, allocation=1.0, chunk_rows=None):
+    # Allocation plan rows for the chosen pair/hub pair positions, as DataFrames of at most chunk_rows rows
+    origin, destination = _label_columns(list(pairs))
+    first_hub, second_hub = _label_columns(list(hub_pairs))
+    allocation = np.broadcast_to(np.asarray(allocation, dtype=float), np.shape(pair))
+    chunk_rows = chunk_rows or max(len(pair), 1)
+    for start in range(0, max(len(pair), 1), chunk_rows):
+        rows = slice(start, start + chunk_rows)
+        yield pd.DataFrame({
+            'Origin': origin[pair[rows]],
+            'Destination': destination[pair[rows]],
+            'First Hub': first_hub[hub_pair[rows]],
+            'Second Hub': second_hub[hub_pair[rows]],
+            'Allocation': allocation[rows],
+        })
+
+
+def allocation_frame(pairs, hub_pairs, pair, hub_pair, allocation=1.0):
+    # The whole allocation plan table in one DataFrame
+    return next(allocation_chunks(pairs, hub_pairs, pair, hub_pair, allocation))
+
+
+def extract_allocation(model, costs=None):
+    # Objective function value and the allocation plan table of a solved model. With the
+    # HubCosts the objective is summed over the chosen paths only, not over every x term
+    pair, hub_pair, allocation = solution_arrays(model.x, len(model.hub_pairs), positions=getattr(model, 'kept_paths', None))
+    if costs is None:
+        objective_value = pyo.value(model.obj)
+    else:
+        path_costs = (costs.leg[costs.pair_origin[pair], costs.first_hub[hub_pair]]
+                      + costs.leg[costs.pair_destination[pair], costs.second_hub[hub_pair]])
+        objective_value = float(path_costs @ allocation)
+    allocation_plan = allocation_frame(model.pairs, model.hub_pairs, pair, hub_pair, allocation)
+    return objective_value, allocation_plan
+
+
+def allocation_matrix(allocation_plan):
+    # Origin x destination view of the hub route of every OD pair, filled by one array
+    # assignment instead of a pivot_table aggregation over Python lists
+    origins, row = np.unique(allocation_plan['Origin'].to_numpy(), return_inverse=True)
+    destinations, column = np.unique(allocation_plan['Destination'].to_numpy(), return_inverse=True)
+    route = allocation_plan['First Hub'].astype(str) + ' > ' + allocation_plan['Second Hub'].astype(str)
+
+    cells = np.full((len(origins), len(destinations)), np.nan, dtype=object)
+    cells[row, column] = route.to_numpy()
+    return pd.DataFrame(cells, index=pd.Index(origins, name='Origin'), columns=pd.Index(destinations, name='Destination'))
+
+
+def write_allocation(allocation_plan, target, file_format=None, chunk_rows=CHUNK_ROWS):
+    """Write an allocation plan to CSV or Parquet one chunk at a time.
+
+    `allocation_plan` is a DataFrame or an iterable of DataFrame chunks (e.g.
+    from allocation_chunks), `target` a path or a binary file object. The
+    format follows the file suffix unless `file_format` ('csv' or 'parquet')
+    is given. Parquet needs pyarrow.
+    """
+    chunks = allocation_plan
+    if isinstance(allocation_plan, pd.DataFrame):
+        chunks = (allocation_plan.iloc[start:start + chunk_rows] for start in range(0, max(len(allocation_plan), 1), chunk_rows))
+    if file_format is None:
+        file_format = 'parquet' if str(target).endswith('.parquet') else 'csv'
+
+    if file_format == 'parquet':
+        if pq is None:
+            raise ImportError('Parquet export needs pyarrow, install it with pip install pyarrow')
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(target, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif file_format == 'csv':
+        with ExitStack() as stack:
+            f = target if hasattr(target, 'write') else stack.enter_context(open(target, 'wb'))
+            for n, chunk in enumerate(chunks):
+                f.write(chunk.to_csv(index=False, header=n == 0).encode())
+    else:
+        raise ValueError(f"file_format must be 'csv' or 'parquet', got {file_format!r}")
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+
+def surviving_paths(costs, p):
+    """Which (pair, hub pair) paths can be optimal for some set of p open hubs.
+
+    Returns a len(pairs) x len(hub_pairs) boolean matrix in the order of
+    `pair_costs()`. Path (k, m) of OD pair (i, j) is dropped when it can
+    never be the cheapest open path:
+
+    - the reverse route (m, k) is strictly cheaper, and it is open whenever
+      k and m are; or
+    - more than H - p other hubs h beat it on a leg, a[i, h] < a[i, k] or
+      a[j, h] < a[j, m]. The p - 2 other open hubs would then include one,
+      and (h, m) or (k, h) is strictly cheaper.
+
+    Every optimal path of every hub set survives, so the reduced model has
+    the same optimum. A larger p only drops more, so the result is also
+    valid for any hub count above `p`.
+    """
+    leg = costs.leg
+    n_hubs = leg.shape[1]
+    first, second = costs.first_hub, costs.second_hub
+
+    # better[i, k, h]: hub h is strictly cheaper than hub k for node i
+    better = leg[:, None, :] < leg[:, :, None]
+    others = np.ones((len(first), n_hubs), dtype=bool)
+    others[np.arange(len(first)), first] = False
+    others[np.arange(len(first)), second] = False
+
+    # One origin block of pairs at a time, as in HubCosts.pair_costs
+    survive = np.empty((len(costs.pairs), len(first)), dtype=bool)
+    block = len(costs.nodes) - 1
+    for start in range(0, len(costs.pairs), block):
+        i = costs.pair_origin[start]
+        j = costs.pair_destination[start:start + block]
+        beaten = (better[i][first][None, :, :] | better[j][:, second, :]) & others[None, :, :]
+        path_cost = leg[i, first][None, :] + leg[j][:, second]
+        reverse_cost = leg[i, second][None, :] + leg[j][:, first]
+        survive[start:start + block] = (beaten.sum(axis=2) <= n_hubs - p) & (path_cost <= reverse_cost)
+    return survive
+
+
+def pruning_report(costs, p_values=None):
+    # Paths kept by surviving_paths for every hub count, default 2..H
+    if p_values is None:
+        p_values = range(2, len(costs.hubs) + 1)
+    total = len(costs.pairs) * len(costs.hub_pairs)
+    kept = [int(surviving_paths(costs, p).sum()) for p in p_values]
+    return pd.DataFrame({'p': list(p_values), 'Paths': total, 'Kept': kept,
+                         'Pruned': [1 - k / total for k in kept]})
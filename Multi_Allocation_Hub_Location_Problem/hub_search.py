@@ -0,0 +1,164 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from hub_evaluate import BATCH_CELLS
+from hub_sweep import resize_hub_set
+
+
+def _open_order(costs, mask, depth=3):
+    # The `depth` cheapest open hubs of every node and their leg costs, inf when fewer are open
+    leg = np.where(mask[None, :], costs.leg.astype(float), np.inf)
+    order = np.argsort(leg, axis=1, kind='stable')[:, :depth]
+    return order, np.take_along_axis(leg, order, axis=1)
+
+
+def _two_without(order, values, nodes, excluded):
+    # Cheapest two of each row's open hubs after dropping hub `excluded` (per row, -1 for none)
+    hub, value = order[nodes], values[nodes].copy()
+    value[hub == excluded[:, None]] = np.inf
+    keep = np.argsort(value, axis=1, kind='stable')[:, :2]
+    return np.take_along_axis(hub, keep, axis=1), np.take_along_axis(value, keep, axis=1)
+
+
+def _cheapest_path(costs, order, values, excluded):
+    # Best k != m per OD pair over the open hubs minus `excluded`: (k, m, cost), cost inf if none
+    origin_hub, origin_value = _two_without(order, values, costs.pair_origin, excluded)
+    destination_hub, destination_value = _two_without(order, values, costs.pair_destination, excluded)
+
+    k, m = origin_hub[:, 0].copy(), destination_hub[:, 0].copy()
+    value = origin_value[:, 0] + destination_value[:, 0]
+
+    # Both legs prefer the same hub: one side takes its second cheapest
+    clash = k == m
+    move_first = origin_value[:, 1] + destination_value[:, 0] < origin_value[:, 0] + destination_value[:, 1]
+    k[clash & move_first] = origin_hub[clash & move_first, 1]
+    m[clash & ~move_first] = destination_hub[clash & ~move_first, 1]
+    value[clash] = np.minimum(origin_value[clash, 1] + destination_value[clash, 0],
+                              origin_value[clash, 0] + destination_value[clash, 1])
+    return k, m, value
+
+
+class _PairCache:
+    """Per OD pair: the best open hub pair, and the best one left if either of its hubs closes.
+
+    Closing hub c then costs every pair one lookup: its best value if c is
+    not on the best path, otherwise the cached value without that hub.
+    """
+
+    def __init__(self, costs, mask):
+        self.mask = mask
+        self.order, self.values = _open_order(costs, mask)
+        none = np.full(len(costs.pairs), -1)
+        self.best_k, self.best_m, self.best = _cheapest_path(costs, self.order, self.values, none)
+        self.without_k = _cheapest_path(costs, self.order, self.values, self.best_k)[2]
+        self.without_m = _cheapest_path(costs, self.order, self.values, self.best_m)[2]
+        self.total = float(self.best.sum())
+
+    def closing(self, hub):
+        # Cost of every OD pair once `hub` is closed, before anything opens
+        return np.where(self.best_k == hub, self.without_k, np.where(self.best_m == hub, self.without_m, self.best))
+
+    def cheapest_without(self, hub):
+        # Cheapest open leg of every node once `hub` is closed
+        return np.where(self.order[:, 0] == hub, self.values[:, 1], self.values[:, 0])
+
+
+def swap_totals(costs, cache, close, candidates):
+    """Exact total cost of closing hub `close` and opening each hub in `candidates`.
+
+    A pair either keeps its best path without `close` (from the cache) or
+    uses the opened hub o on one leg with its cheapest remaining hub on the
+    other, so one move costs a few array passes over the OD pairs.
+    """
+    remaining = cache.closing(close)
+    node_best = cache.cheapest_without(close)
+    candidate_leg = costs.leg[:, candidates].astype(float)
+
+    totals = np.zeros(len(candidates))
+    batch = max(1, BATCH_CELLS // max(len(candidates), 1))
+    for start in range(0, len(costs.pairs), batch):
+        rows = slice(start, start + batch)
+        i, j = costs.pair_origin[rows], costs.pair_destination[rows]
+        via_open = np.minimum(candidate_leg[i] + node_best[j][:, None], node_best[i][:, None] + candidate_leg[j])
+        totals += np.minimum(remaining[rows][:, None], via_open).sum(axis=0)
+    return totals
+
+
+def local_search(costs, p, time_limit=10.0, max_iterations=10_000, tenure=None, patience=None,
+                 start=None, callback=None):
+    """Greedy construction followed by swap tabu search over the open hub set.
+
+    The greedy start opens the two hubs with the lowest total leg cost and
+    adds the hub with the cheapest closed-form total until p are open (or
+    resizes `start`). Each iteration scores every swap (close one open hub,
+    open one closed hub) exactly from the per-pair cache and makes the best
+    one that is not tabu: a hub that changed sides stays there for `tenure`
+    iterations unless the move beats the best solution found. The search
+    stops after `time_limit` seconds, `max_iterations`, or `patience`
+    iterations without a new best.
+
+    `callback(progress)` is called after the greedy start and every
+    iteration with the Iteration, Objective (current), Best, Open Hubs (of
+    the best) and Seconds; returning True stops the search and keeps the
+    best solution. Returns (objective value, open hubs, history).
+    """
+    n_hubs = len(costs.hubs)
+    if not 2 <= p <= n_hubs:
+        raise ValueError(f'p must be between 2 and {n_hubs}, got {p}')
+    if tenure is None:
+        tenure = max(1, min(p, n_hubs - p) // 2)
+    if patience is None:
+        patience = 4 * n_hubs
+
+    begin = time.perf_counter()
+    if start is None:
+        start = [costs.hubs[h] for h in np.argsort(costs.leg.sum(axis=0), kind='stable')[:2]]
+    mask = np.isin(costs.hubs, resize_hub_set(costs, start, p))
+
+    cache = _PairCache(costs, mask)
+    best_value, best_mask = cache.total, mask.copy()
+    tabu_until = np.zeros(n_hubs, dtype=int)
+    history = []
+
+    def report(iteration, move):
+        progress = {'Iteration': iteration, 'Objective': cache.total, 'Best': best_value, 'Move': move,
+                    'Open Hubs': ', '.join(hub for hub, is_open in zip(costs.hubs, best_mask) if is_open),
+                    'Seconds': time.perf_counter() - begin}
+        history.append(progress)
+        return callback is not None and callback(progress)
+
+    stop = report(0, 'greedy start')
+    stalled = 0
+    for iteration in range(1, max_iterations + 1):
+        if stop or p == n_hubs or time.perf_counter() - begin >= time_limit or stalled >= patience:
+            break
+
+        # Best allowed swap: not tabu, or better than the best solution so far
+        closed = np.flatnonzero(~cache.mask)
+        best_move = None
+        for close in np.flatnonzero(cache.mask):
+            totals = swap_totals(costs, cache, close, closed)
+            allowed = ((tabu_until[closed] <= iteration) & (tabu_until[close] <= iteration)) | (totals < best_value - 1e-9)
+            if allowed.any():
+                pick = np.flatnonzero(allowed)[np.argmin(totals[allowed])]
+                if best_move is None or totals[pick] < best_move[0]:
+                    best_move = (totals[pick], close, closed[pick])
+        if best_move is None:
+            break
+
+        _, close, opened = best_move
+        mask = cache.mask.copy()
+        mask[close], mask[opened] = False, True
+        cache = _PairCache(costs, mask)
+        tabu_until[[close, opened]] = iteration + tenure + 1
+
+        if cache.total < best_value - 1e-9:
+            best_value, best_mask, stalled = cache.total, mask.copy(), 0
+        else:
+            stalled += 1
+        stop = report(iteration, f'close {costs.hubs[close]}, open {costs.hubs[opened]}')
+
+    open_hubs = [hub for hub, is_open in zip(costs.hubs, best_mask) if is_open]
+    return best_value, open_hubs, pd.DataFrame(history)
@@ -0,0 +1,89 @@
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from hub_model import allocation_frame
+
+
+def build_matrices(costs, p):
+    """The path formulation of hub_model.build_model as sparse arrays, without Pyomo.
+
+    Columns are x[(i, j), (k, m)] in pairs x hub_pairs row-major order, then
+    y[k]. Rows are total_hubs_constraint, allocation_constraint per pair, then
+    flow_constraint_a and flow_constraint_b per (pair, hub). Returns
+    (c, A, row_lower, row_upper) with A in CSR format.
+    """
+    n_pairs, n_hub_pairs, n_hubs = len(costs.pairs), len(costs.hub_pairs), len(costs.hubs)
+    n_x = n_pairs * n_hub_pairs
+    c = np.concatenate([costs.pair_costs().ravel().astype(float), np.zeros(n_hubs)])
+
+    # Index arithmetic: x column r * S + s belongs to pair r and hub pair s
+    x_pair = np.repeat(np.arange(n_pairs), n_hub_pairs)
+    x_first = np.tile(costs.first_hub, n_pairs)
+    x_second = np.tile(costs.second_hub, n_pairs)
+    x_cols = np.arange(n_x)
+    y_cols = n_x + np.arange(n_hubs)
+
+    # Row blocks: total hubs (1), allocation (P), flow a (P * H), flow b (P * H)
+    allocation_start = 1
+    flow_a_start = allocation_start + n_pairs
+    flow_b_start = flow_a_start + n_pairs * n_hubs
+    n_rows = flow_b_start + n_pairs * n_hubs
+
+    flow_rows = np.arange(n_pairs * n_hubs)
+    rows = np.concatenate([
+        np.zeros(n_hubs, dtype=np.int64),                   # sum of y = p
+        allocation_start + x_pair,                          # sum over (k, m) of x = 1
+        flow_a_start + x_pair * n_hubs + x_first,           # sum over m of x - y[k] <= 0
+        flow_a_start + flow_rows,
+        flow_b_start + x_pair * n_hubs + x_second,          # sum over k of x - y[m] <= 0
+        flow_b_start + flow_rows,
+    ])
+    cols = np.concatenate([
+        y_cols,
+        x_cols,
+        x_cols,
+        y_cols[flow_rows % n_hubs],
+        x_cols,
+        y_cols[flow_rows % n_hubs],
+    ])
+    values = np.concatenate([
+        np.ones(n_hubs),
+        np.ones(n_x),
+        np.ones(n_x),
+        -np.ones(n_pairs * n_hubs),
+        np.ones(n_x),
+        -np.ones(n_pairs * n_hubs),
+    ])
+    A = sparse.csr_array((values, (rows, cols)), shape=(n_rows, n_x + n_hubs))
+
+    row_lower = np.concatenate([[p], np.ones(n_pairs), np.full(2 * n_pairs * n_hubs, -np.inf)])
+    row_upper = np.concatenate([[p], np.ones(n_pairs), np.zeros(2 * n_pairs * n_hubs)])
+    return c, A, row_lower, row_upper
+
+
+def solve_sparse(costs, p, time_limit=None, mip_rel_gap=None):
+    """Build the sparse model and solve it with scipy.optimize.milp (HiGHS).
+
+    Returns (objective value, allocation plan) in the same form as
+    hub_model.extract_allocation.
+    """
+    c, A, row_lower, row_upper = build_matrices(costs, p)
+
+    options = {}
+    if time_limit is not None:
+        options['time_limit'] = time_limit
+    if mip_rel_gap is not None:
+        options['mip_rel_gap'] = mip_rel_gap
+
+    result = milp(c, constraints=LinearConstraint(A, row_lower, row_upper),
+                  integrality=np.ones(len(c)), bounds=Bounds(0, 1), options=options)
+    if result.x is None:
+        raise RuntimeError(f'No solution found: {result.message}')
+
+    # Map the chosen x columns back to labels
+    n_hub_pairs = len(costs.hub_pairs)
+    chosen = np.flatnonzero(result.x[:len(costs.pairs) * n_hub_pairs] > 0.5)
+    pair, hub_pair = np.divmod(chosen, n_hub_pairs)
+    allocation_plan = allocation_frame(costs.pairs, costs.hub_pairs, pair, hub_pair)
+    return float(result.fun), allocation_plan
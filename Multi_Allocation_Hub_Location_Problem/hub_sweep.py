@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+
+from hub_evaluate import allocate, evaluate_hub_sets, hub_set_masks
+from hub_model import build_model
+
+# solver_race.py lives in the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from solver_race import configure_solver
+
+
+def resize_hub_set(costs, open_hubs, p):
+    # Add (or drop) one hub at a time, always the move with the cheapest closed-form total
+    hub_set = list(open_hubs)
+    while len(hub_set) != p:
+        if len(hub_set) < p:
+            candidates = [hub_set + [hub] for hub in costs.hubs if hub not in hub_set]
+        else:
+            candidates = [[hub for hub in hub_set if hub != drop] for drop in hub_set]
+        totals = evaluate_hub_sets(costs, hub_set_masks(costs, candidates))
+        hub_set = candidates[int(np.argmin(totals))]
+    return [hub for hub in costs.hubs if hub in hub_set]
+
+
+def warm_start(model, costs, open_hubs):
+    # Load a feasible incumbent into the model: the optimal allocation to the open hubs
+    objective_value, allocation_plan = allocate(costs, open_hubs)
+    model.x.set_values(dict.fromkeys(model.x, 0))
+    for i, j, k, m in allocation_plan[['Origin', 'Destination', 'First Hub', 'Second Hub']].itertuples(index=False):
+        model.x[(i, j), (k, m)] = 1
+    model.y.set_values({k: int(k in open_hubs) for k in model.hubs})
+    return objective_value
+
+
+def sweep_p(costs, p_values=None, solver='glpk', model=None, compare=False, prune=False, time_limit=None, mip_gap=None,
+            callback=None):
+    """Solve the hub model for every p in `p_values` (default 2..H) on one model.
+
+    The model is built once (or passed in) and only its mutable `p` changes
+    between solves. When the solver accepts warm starts, each point starts from
+    the previous point's incumbent resized to p hubs. With `compare=True` every
+    p is also built and solved from scratch to time the independent approach.
+    `time_limit` (seconds) and `mip_gap` apply to each point's solve, and
+    `callback(row)` is called after every point.
+
+    Returns a table with one row per p: objective, open hubs, termination,
+    sweep seconds (the first point includes the model build) and, if
+    compared, the independent seconds. A point stopped by the limit keeps
+    its best incumbent, or has no objective if it found none. With
+    prune=True the built model only has the paths that can be optimal for
+    the smallest p, which covers every larger p.
+    """
+    if p_values is None:
+        p_values = range(2, len(costs.hubs) + 1)
+
+    start = time.perf_counter()
+    if model is None:
+        model = build_model(costs, min(p_values), prune=prune)
+    opt = configure_solver(solver, time_limit, mip_gap)
+    can_warm_start = opt.warm_start_capable()
+
+    rows = []
+    open_hubs = None
+    for p in p_values:
+        model.p = p
+        if open_hubs is not None and can_warm_start:
+            warm_start(model, costs, resize_hub_set(costs, open_hubs, p))
+            results = opt.solve(model, warmstart=True, load_solutions=False)
+        else:
+            results = opt.solve(model, load_solutions=False)
+
+        row = {'p': p, 'Objective': None, 'Open Hubs': None, 'Termination': str(results.solver.termination_condition)}
+        if len(results.solution):
+            model.solutions.load_from(results)
+            open_hubs = [k for k in model.hubs if pyo.value(model.y[k]) > 0.5]
+            row.update({'Objective': pyo.value(model.obj), 'Open Hubs': ', '.join(open_hubs)})
+        row['Seconds'] = time.perf_counter() - start
+
+        if compare:
+            independent_start = time.perf_counter()
+            configure_solver(solver, time_limit, mip_gap).solve(build_model(costs, p, prune=prune))
+            row['Independent Seconds'] = time.perf_counter() - independent_start
+
+        rows.append(row)
+        if callback is not None:
+            callback(row)
+        start = time.perf_counter()
+
+    return pd.DataFrame(rows)
@@ -1,115 +1,382 @@
+import logging
+import os
+import sys
+from io import BytesIO
+
 import streamlit as st
 import pandas as pd
-import pyomo.environ as pyo
+
+from hub_background import BackgroundSolve
+from hub_cache import SolveCache, solve_key
+from hub_cost import HubCosts, load_cost_matrix, matrix_key
+from hub_evaluate import allocate, enumerate_hub_sets
+from hub_incremental import IncrementalHub
+from hub_lagrangian import lagrangian
+from hub_model import allocation_matrix, write_allocation
+from hub_search import local_search
+from hub_sparse import solve_sparse
+
+# phase_timer.py and solver_race.py live in the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from phase_timer import PhaseTimer
+from solver_race import installed_solvers
 
 # Streamlit app title
 st.title("Multiple-Allocation Problem with Interconnected Hubs")
 
 
+# Methods solved as a Pyomo MILP in a background process, with their formulation
+MILP_METHODS = {"MILP": 'path', "MILP, compact flow formulation": 'flow'}
+
+
+# Streamlit reruns this script on every widget change, so parsing and the cost arrays are
+# cached on content rather than redone each time. Pyomo models are not: MILP solves and the
+# p-sweep build theirs in the background process, and proven MILP optima are cached on disk
+@st.cache_data(max_entries=8)
+def read_cost_matrix(content):
+    return load_cost_matrix(BytesIO(content))
+
+
+@st.cache_resource(max_entries=8)
+def cached_costs(key, _cost_df):
+    return HubCosts(_cost_df)
+
+
+@st.cache_resource
+def default_solver():
+    # First installed of glpk, cbc and appsi_highs, so the preselected solver runs on this machine
+    installed = installed_solvers()
+    return installed[0] if installed else 'glpk'
+
+
+@st.cache_resource
+def solve_cache():
+    # Solve results on disk, shared by every session and kept across restarts
+    return SolveCache()
+
+
+def show_allocation(allocation_plan):
+    st.write("\nAllocation Plan Table")
+    st.write(allocation_plan[['Origin', 'Destination', 'First Hub', 'Second Hub']])
+
+    with st.expander("Origin x destination hub routes"):
+        st.write(allocation_matrix(allocation_plan))
+
+    # Exports are written in chunks, so large plans never become one big string
+    for file_format, mime in [('csv', 'text/csv'), ('parquet', 'application/octet-stream')]:
+        buffer = BytesIO()
+        try:
+            write_allocation(allocation_plan, buffer, file_format=file_format)
+        except ImportError as error:
+            st.caption(str(error))
+            continue
+        st.download_button(f"Download allocation plan ({file_format.upper()})", buffer.getvalue(),
+                           file_name=f'allocation_plan.{file_format}', mime=mime)
+
+
+# Seconds per phase of this rerun, shown under "Run timings" after a calculation
+timer = PhaseTimer('multi_hub_app')
+
 # Optional file upload
 uploaded_file = st.file_uploader("Upload Cost Matrix Excel file", type=["xlsx"])
 
+timer.start('read')
 if uploaded_file is not None:
-    cost_df = pd.read_excel(uploaded_file)
+    content = uploaded_file.getvalue()
 else:
 
     # Load the data into a DataFrame
     # cost_df = pd.read_excel('Multi_Allocation_Hub_Location_Problem/cost_matrix_multi_hub.xlsx')
-    cost_df = pd.read_excel('Multi_Allocation_Hub_Location_Problem/cost_matrix_multi_hub.xlsx')
+    with open('Multi_Allocation_Hub_Location_Problem/cost_matrix_multi_hub.xlsx', 'rb') as f:
+        content = f.read()
 
 
 # Load the data into a DataFrame
 # cost_df = pd.DataFrame(cost_data)
-cost_df.set_index('Unnamed: 0', inplace=True)
+cost_df = read_cost_matrix(content)
+timer.stop()
 st.write("Cost Matrix:")
 editable_cost_df = st.data_editor(cost_df)
 
 
-# Transform the DataFrame into a dictionary for combined costs c(i, k, m, j)
-cost = {}
-nodes = list(editable_cost_df.index)
-hubs = list(editable_cost_df.columns)
-pairs = [(i, j) for i in nodes for j in nodes if i != j]
-hub_pairs = [(k, m) for k in hubs for m in hubs if k != m]
-
-for i in editable_cost_df.index:
-    for j in editable_cost_df.index:
-        if i != j:
-            for k in editable_cost_df.columns:
-                for m in editable_cost_df.columns:
-                    if k != m:
-                        cost[(i, k, m, j)] = editable_cost_df.loc[i, k] + editable_cost_df.loc[j, m]
-
-# Initialize the model
-model = pyo.ConcreteModel()
+# Combined costs c(i, k, m, j) as arrays indexed by node/hub position, rebuilt only when the edited matrix changes
+with timer.phase('costs'):
+    cost_key = matrix_key(editable_cost_df)
+    costs = cached_costs(cost_key, editable_cost_df)
+nodes = costs.nodes
+hubs = costs.hubs
+pairs = costs.pairs
+hub_pairs = costs.hub_pairs
 
 # Number of hubs to be used (modifiable via Streamlit)
 p = st.slider("Number of hubs to be used", min_value=2, max_value=len(hubs), value=5)
 
+# Either solve the full MILP, or score every C(H, p) hub set in closed form without a solver
+method = st.selectbox("Solution method", ["MILP", "Exact enumeration (no solver)", "Benders decomposition", "Lagrangian relaxation (no solver)", "MILP (sparse arrays, SciPy HiGHS)", "MILP, compact flow formulation", "Local search (no solver)", "MILP, incremental what-if (HiGHS)"])
 
-if st.button('Calculate'):
+# Wall-clock budget of the anytime local search, it returns the best hub set found so far
+if method == "Local search (no solver)":
+    time_budget = st.number_input("Time budget (seconds)", min_value=1.0, value=10.0, step=1.0)
 
-    # Define sets
-    model.pairs = pyo.Set(initialize=pairs, dimen=2)
-    model.hub_pairs = pyo.Set(initialize=hub_pairs, dimen=2)
-    model.hubs = pyo.Set(initialize=hubs)
+# Leave out the hub pairs that provably cannot be optimal for this p (path MILP and its p-sweep only)
+prune = False
+if method == "MILP":
+    prune = st.checkbox("Prune dominated hub pairs (MILP)", value=True)
 
-    # Decision Variables
-    model.x = pyo.Var(model.pairs, model.hub_pairs, within=pyo.Binary)
-    model.y = pyo.Var(model.hubs, within=pyo.Binary)
+# Solver, wall-clock limit and relative gap of the MILP; the best incumbent is kept when a limit stops it.
+# "race" runs every installed solver at once and keeps the first proven optimum
+# Benders solves its master problems with the solver, and stops at the gap or the time limit
+if method in MILP_METHODS or method == "Benders decomposition":
+    solver_options = ["glpk", "cbc", "appsi_highs", "race"]
+    solver = st.selectbox("MILP solver", solver_options, index=solver_options.index(default_solver()))
+if method in MILP_METHODS or method in ["Benders decomposition", "MILP (sparse arrays, SciPy HiGHS)", "MILP, incremental what-if (HiGHS)"]:
+    time_limit = st.number_input("Time limit (seconds)", min_value=1.0, value=60.0, step=10.0)
+    mip_gap = st.number_input("Relative gap", min_value=0.0, max_value=1.0, value=0.0, step=0.01, format="%.4f")
 
-    # Objective function: Minimize total cost
-    def objective_rule(model):
-        return sum(cost[(i, k, m, j)] * model.x[(i, j), (k, m)]
-                for (i, j) in model.pairs for (k, m) in model.hub_pairs)
+calculate = st.button('Calculate')
 
-    model.obj = pyo.Objective(rule=objective_rule, sense=pyo.minimize)
+# Cost curve over every hub count, re-solving the same path model with the solver, limit and gap above
+sweep = False
+if method == "MILP":
+    sweep = st.button('Sweep all p (MILP)')
 
-    # Constraints
-    # Total hubs constraint
-    def total_hubs_constraint(model):
-        return sum(model.y[k] for k in model.hubs) == p
+if calculate and method == "Exact enumeration (no solver)":
 
-    model.total_hubs_constraint = pyo.Constraint(rule=total_hubs_constraint)
+    with timer.phase('solve'):
+        objective_value, open_hubs, evaluated = enumerate_hub_sets(costs, p)
+    with timer.phase('extract'):
+        objective_value, allocation_plan = allocate(costs, open_hubs)
 
-    # Allocation constraint
-    def allocation_constraint(model, i, j):
-        return sum(model.x[(i, j), (k, m)] for (k, m) in model.hub_pairs) == 1
+    st.write("\nObjective Function Value:", objective_value)
+    st.write(f"Open hubs: {', '.join(open_hubs)} (best of {evaluated:,} hub sets)")
 
-    model.allocation_constraint = pyo.Constraint(model.pairs, rule=allocation_constraint)
+    show_allocation(allocation_plan)
 
-    # First flow constraint
-    def flow_constraint_a(model, i, j, k):
-        return sum(model.x[(i, j), (k, m)] for m in hubs if k != m) <= model.y[k]
+if calculate and method == "Lagrangian relaxation (no solver)":
 
-    model.flow_constraint_a = pyo.Constraint(pairs, hubs, rule=flow_constraint_a)
+    # Best hub plan found by subgradient search, certified by the Lagrangian lower bound
+    with timer.phase('solve'):
+        objective_value, open_hubs, lower_bound, history = lagrangian(costs, p)
+    with timer.phase('extract'):
+        objective_value, allocation_plan = allocate(costs, open_hubs)
 
-    # Second flow constraint 
-    def flow_constraint_b(model, i, j, m):
-        return sum(model.x[(i, j), (k, m)] for k in hubs if m != k) <= model.y[m]
+    st.write("\nObjective Function Value:", objective_value)
+    st.write(f"Open hubs: {', '.join(open_hubs)}")
+    st.write(f"Lower bound: {lower_bound:,.2f} (gap {history['Gap'].iloc[-1]:.2%} after {len(history)} iterations)")
 
-    model.flow_constraint_b = pyo.Constraint(pairs, hubs, rule=flow_constraint_b)
+    st.write("\nBounds per Iteration")
+    st.line_chart(history.set_index('Iteration')[['Lower Bound', 'Upper Bound']])
 
-    # Non-negativity and binary constraints are implicit in the variable definitions
+    show_allocation(allocation_plan)
 
-    # Solve the model
-    # opt = pyo.SolverFactory('cbc', executable='Multi_Allocation_Hub_Location_Problem\\bin\\cbc.exe')  # Change solver if needed
-    # opt = pyo.SolverFactory('cbc', executable='Multi_Allocation_Hub_Location_Problem/bin/cbc.exe')  # Change solver if needed
-    opt = pyo.SolverFactory('glpk')
-    results = opt.solve(model)
+if calculate and method == "Local search (no solver)":
 
-    # Extract the objective function value
-    objective_value = pyo.value(model.obj)
-    st.write("\nObjective Function Value:", objective_value)
+    # Greedy start, then swap tabu search; the incumbent is redrawn after every iteration
+    progress_bar = st.progress(0.0)
+    status = st.empty()
+    chart = st.empty()
+    progress_rows = []
 
-    # Extract results
-    allocation_plan = pd.DataFrame(
-        [(i, j, k, m, pyo.value(model.x[(i, j), (k, m)])) for (i, j) in model.pairs for (k, m) in model.hub_pairs if pyo.value(model.x[(i, j), (k, m)]) > 0],
-        columns=['Origin', 'Destination', 'First Hub', 'Second Hub', 'Allocation']
-    )
+    def show_progress(progress):
+        progress_rows.append(progress)
+        progress_bar.progress(min(progress['Seconds'] / time_budget, 1.0))
+        status.write(f"Iteration {progress['Iteration']}: best {progress['Best']:,.2f} with hubs {progress['Open Hubs']}")
+        chart.line_chart(pd.DataFrame(progress_rows).set_index('Iteration')[['Objective', 'Best']])
 
-    st.write("\nAllocation Plan Table")
-    st.write(allocation_plan[['Origin', 'Destination', 'First Hub', 'Second Hub']])
+    with timer.phase('solve'):
+        objective_value, open_hubs, history = local_search(costs, p, time_limit=time_budget, callback=show_progress)
+    progress_bar.progress(1.0)
+    with timer.phase('extract'):
+        objective_value, allocation_plan = allocate(costs, open_hubs)
+
+    st.write("\nObjective Function Value:", objective_value)
+    st.write(f"Open hubs: {', '.join(open_hubs)} (best of {len(history) - 1} swap iterations)")
+
+    show_allocation(allocation_plan)
+
+if calculate and method == "MILP (sparse arrays, SciPy HiGHS)":
+
+    # Same formulation assembled as sparse matrices, no Pyomo expressions or LP file
+    # SciPy's HiGHS stops at the time limit or gap with the best incumbent, and raises when it has none
+    try:
+        with timer.phase('solve'):
+            objective_value, allocation_plan = solve_sparse(costs, p, time_limit=time_limit, mip_rel_gap=mip_gap)
+    except RuntimeError as error:
+        st.error(str(error))
+    else:
+        st.write("\nObjective Function Value:", objective_value)
+
+        show_allocation(allocation_plan)
+
+if calculate and method == "MILP, incremental what-if (HiGHS)":
+
+    # One model and HiGHS instance per session: a data editor edit or another p only updates the
+    # affected objective coefficients and the hub count, and HiGHS starts from the last solution
+    whatif = st.session_state.get('whatif')
+    if whatif is None or not whatif.matches(costs):
+        with timer.phase('build'):
+            whatif = st.session_state.whatif = IncrementalHub(costs, p)
+        changes = None
+    else:
+        with timer.phase('update'):
+            changes = whatif.update(costs, p)
+        timer.record(changed_cells=changes[0], changed_coefficients=changes[1])
+    with timer.phase('solve'):
+        objective_value, allocation_plan, open_hubs, termination = whatif.solve(time_limit=time_limit, mip_gap=mip_gap)
+
+    if objective_value is None:
+        st.error(f"No solution found ({termination})")
+    else:
+        st.write("\nObjective Function Value:", objective_value)
+        st.write(f"Open hubs: {', '.join(open_hubs)}")
+        if changes is None:
+            st.caption("Model built and loaded into HiGHS; later edits update it in place")
+        else:
+            st.caption(f"Re-solved from the previous plan after {changes[0]} edited cells ({changes[1]:,} objective coefficients updated)")
+        if termination != 'optimal':
+            st.caption(f"Solver stopped ({termination}): best incumbent found")
+
+        show_allocation(allocation_plan)
+
+if calculate or sweep:
+
+    # A new calculation or sweep replaces a background solve that is still running, or a cached result on show
+    previous = st.session_state.pop('job', None)
+    if previous is not None:
+        previous.cancel()
+    st.session_state.pop('cached_solve', None)
+
+if calculate and method in MILP_METHODS:
+
+    # The same matrix (data editor edits included), p, formulation and solver options as an earlier
+    # proven-optimal solve is answered from disk; otherwise the model is built and solved in a separate
+    # process, so the page stays responsive and the solve can be cancelled. The time limit is not part of
+    # the key: only proven optima are stored, and those hold whatever the limit
+    formulation = MILP_METHODS[method]
+    key = solve_key(editable_cost_df, p, formulation, solver=solver, mip_gap=mip_gap,
+                    prune=prune if formulation == 'path' else None)
+    with timer.phase('cache'):
+        entry = solve_cache().get(key)
+    timer.record(cache_hit=entry is not None)
+    if entry is not None:
+        st.session_state.cached_solve = entry
+    else:
+        st.session_state.job = BackgroundSolve(costs, p, formulation=formulation, prune=prune, solver=solver,
+                                               time_limit=time_limit, mip_gap=mip_gap).start()
+        st.session_state.job_key = key
+
+if calculate and method == "Benders decomposition":
+
+    # Master holds only y and the p-hub constraint, OD-pair subproblems return cuts. Many small
+    # master solves in turn, so "race" uses the first installed solver instead
+    st.session_state.job = BackgroundSolve(costs, p, solver=solver, time_limit=time_limit, mip_gap=mip_gap, method='benders').start()
+
+if sweep:
+
+    # Every p on one model in the background, cancellable like a single solve
+    st.session_state.job = BackgroundSolve(costs, p, prune=prune, solver=solver, time_limit=time_limit, mip_gap=mip_gap,
+                                           method='sweep').start()
+
+
+def describe(value):
+    return '-' if value is None else f'{value:,.2f}'
+
+
+def show_sweep(result):
+    sweep_results = result['sweep']
+    st.write("\nObjective per Number of Hubs")
+    st.line_chart(sweep_results.set_index('p')['Objective'])
+    st.write(sweep_results)
+
+
+def show_solve(result, bound=None, cached=False):
+    st.write("\nObjective Function Value:", result['objective'])
+    st.write(f"Open hubs: {', '.join(result['open_hubs'])}")
+    if cached:
+        st.caption(f"Cached result: solved {result['solved_at']} in {sum(result['seconds'].values()):.2f} s, no solver run")
+    if result['termination'] != 'optimal':
+        st.caption(f"Solver stopped ({result['termination']}): best incumbent found, bound {describe(bound)}")
+    if result['paths'] is not None and result['paths'] < len(pairs) * len(hub_pairs):
+        st.caption(f"{result['paths']:,} of {len(pairs) * len(hub_pairs):,} path variables kept after pruning")
+
+    if result['race'] is not None:
+        st.caption(f"Solver race won by {result['winner']}")
+        with st.expander("Solver race"):
+            st.write(result['race'])
+
+    if result.get('history') is not None and len(result['history']):
+        st.caption(f"Master problems solved with {result['solver']}")
+        st.write("\nBounds per Iteration")
+        st.line_chart(result['history'].set_index('Iteration')[['Lower Bound', 'Upper Bound']])
+        st.write(result['history'])
+
+    show_allocation(result['allocation_plan'])
+
+
+@st.fragment(run_every=1.0)
+def solve_status(job):
+    # Redrawn every second from the solver log; the whole page reruns once the job is over
+    progress = job.progress()
+    if progress['status'] != 'running':
+        st.rerun()
+    if job.method == 'sweep':
+        lines = job.log().splitlines()
+        st.write(f"Sweeping p with {job.solver}: {progress['seconds']:.0f} s elapsed, last point {lines[-1] if lines else '-'}")
+    else:
+        gap = '-' if progress['gap'] is None else f"{progress['gap']:.2%}"
+        label = "Benders decomposition" if job.method == 'benders' else "Solving"
+        st.write(f"{label} with {', '.join(job.racers)}: {progress['seconds']:.0f} s elapsed, incumbent {describe(progress['incumbent'])}, "
+                 f"bound {describe(progress['bound'])}, gap {gap}")
+    if st.button("Cancel"):
+        job.cancel()
+        st.rerun()
+
+
+job = st.session_state.get('job')
+running = job is not None and job.progress()['status'] == 'running'
+
+# True on the first rerun after the job is over, so its timings are reported (and its result cached) once
+job_finished = job is not None and not running and st.session_state.get('reported_job') is not job
+if job_finished:
+    st.session_state.reported_job = job
+
+if 'cached_solve' in st.session_state:
+    show_solve(st.session_state.cached_solve, cached=True)
+elif running:
+    solve_status(job)
+elif job is not None:
+    progress, result = job.progress(), job.result()
+    if progress['status'] == 'cancelled':
+        st.warning(f"{'Sweep' if job.method == 'sweep' else 'Solve'} cancelled after {progress['seconds']:.0f} seconds")
+    elif 'error' in result:
+        st.error(result['error'])
+    elif job.method == 'sweep':
+        show_sweep(result)
+    else:
+        show_solve(result, bound=progress['bound'])
+
+    # Phases of the worker process join this rerun's timings once
+    if job_finished:
+        timer.seconds.update(result['seconds'] if result is not None else {})
+        if result is not None and 'variables' in result:
+            timer.record(variables=result['variables'], constraints=result['constraints'])
+        if result is not None and result.get('winner') is not None:
+            timer.record(race_winner=result['winner'])
+
+        # Only proven MILP optima are stored: a rerun of a limit-stopped solve could do better
+        if job.method == 'milp' and result is not None and result.get('termination') == 'optimal':
+            solve_cache().put(st.session_state.job_key, dict(result, solved_at=pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')))
+
+if calculate or job_finished:
+
+    # Cached phases (read, costs, build) show near-zero time when reused
+    with st.expander("Run timings"):
+        st.write(timer.table())
+        st.write(timer.counters)
+        st.code(timer.log_line(), language='json')
+
+    # Same numbers as one JSON line in the server log (at INFO level), for comparing runs
+    logging.getLogger(__name__).info(timer.log_line())
 
 
 # running note
@@ -1,5 +1,15 @@
 import pyomo.environ as pyo
 import pandas as pd
+import os
+import sys
+
+# phase_timer.py and solver_race.py live in the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from phase_timer import PhaseTimer
+from solver_race import SolverRace
+
+timer = PhaseTimer('Code 1')
+timer.start('build')
 
 # Initialize model
 model = pyo.ConcreteModel()
@@ -102,13 +112,21 @@ def inspection_constraint(model):
     return sum(model.ship[p, r, c] for p in [1, 2] for r in products for c in ['RAYco', 'HONco']) <= inspection_capacity
 model.inspection_constraint = pyo.Constraint(rule=inspection_constraint)
 
+# Model size and the LP file a shell solver would write
+timer.stop()
+timer.record_model(model)
+timer.write_lp(model)
+
 # Solve the model
 opt = pyo.SolverFactory('cbc', executable='C:\\bin\\cbc.exe')
+# or race the solvers installed on PATH (GLPK, CBC, HiGHS), the first proven optimum wins:
+# opt = SolverRace()
 #opt = pyo.SolverFactory('gurobi')
-results = opt.solve(model)
+results = timer.solve(opt, model)
 model.pprint()
 
 # Extract results
+timer.start('extract')
 production_plan = pd.DataFrame([(p, r, pyo.value(model.prod[p, r])) for p in plants for r in products], columns=['Plant', 'Product', 'Production'])
 shipping_plan = pd.DataFrame([(p, r, c, pyo.value(model.ship[p, r, c])) for p in plants for r in products for c in customers], columns=['Plant', 'Product', 'Customer', 'Shipping'])
 
@@ -146,6 +164,8 @@ plant_revenue = shipping_plan.groupby('Plant')['Revenue'].sum()
 plant_total_cost = plant_production_cost + plant_shipping_cost
 plant_net_revenue = plant_revenue - plant_total_cost
 
+timer.stop()
+
 #Print the costs and revenues for each plant
 print("\nCosts and Revenues for Each Plant")
 for plant in plants:
@@ -157,6 +177,9 @@ for plant in plants:
     print(f"  Net Revenue: ${plant_net_revenue[plant]:,.2f}\n")
 
 
+print(timer.log_line())
+
+
 # NOTE: To switch the model to our own understanding, go to Demand Constraint function and change:
     # sum(model.ship[p, r, c] * sales_price[c][r]  for p in plants) <= demand[c][r] 
     # to become -> sum(model.ship[p, r, c] for p in plants) <= demand[c][r] 
\ No newline at end of file
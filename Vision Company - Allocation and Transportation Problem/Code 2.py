@@ -1,5 +1,14 @@
 import pyomo.environ as pyo
 import pandas as pd
+import os
+import sys
+
+# phase_timer.py lives in the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from phase_timer import PhaseTimer
+
+timer = PhaseTimer('Code 2')
+timer.start('build')
 
 # Initialize model
 model = pyo.ConcreteModel()
@@ -104,16 +113,22 @@ model.inspection_constraint = pyo.Constraint(rule=inspection_constraint)
 
 model.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
 
+# Model size and the LP file a shell solver would write
+timer.stop()
+timer.record_model(model)
+timer.write_lp(model)
+
 # Solve the model
 #opt = pyo.SolverFactory('cbc', executable='C:\\bin\\cbc.exe')
 #opt = pyo.SolverFactory('IPOPT')
 #opt =  pyo.SolverFactory('couenne', executable = 'C:\\couenne\\bin\\couenne.exe')
 #opt = pyo.SolverFactory('gurobi')
 opt = pyo.SolverFactory('cplex')
-results = opt.solve(model)
+results = timer.solve(opt, model)
 #model.pprint()
 
 # Extract results
+timer.start('extract')
 production_plan = pd.DataFrame([(p, r, pyo.value(model.prod[p, r])) for p in plants for r in products], columns=['Plant', 'Product', 'Production'])
 shipping_plan = pd.DataFrame([(p, r, c, pyo.value(model.ship[p, r, c])) for p in plants for r in products for c in customers], columns=['Plant', 'Product', 'Customer', 'Shipping'])
 
@@ -158,6 +173,8 @@ plant_revenue = shipping_plan.groupby('Plant')['Revenue'].sum()
 plant_total_cost = plant_production_cost + plant_shipping_cost
 plant_net_revenue = plant_revenue - plant_total_cost
 
+timer.stop()
+
 #Print the costs and revenues for each plant
 # print("\nCosts and Revenues for Each Plant")
 # for plant in plants:
@@ -178,13 +195,16 @@ profits = []
 
 
 
+# Persistent alternative: rhs_sweep(build_model(), 'material', range(0, 200, 5)) from vision_model.py
+# keeps the model loaded in HiGHS and only changes the right-hand side between solves
+timer.start('sensitivity')
 for extra_material in range(0, 200, 5):  # Example range from 0 to 2000 in increments of 100
     # Modify the material constraint
     model.del_component(model.material_constraint)
     model.material_constraint = pyo.Constraint(expr=sum(model.prod[p, r] * material[p][r] for p in plants for r in products) <= total_material + extra_material)
     
     # Solve the model
-    results = opt.solve(model)
+    results = timer.solve(opt, model)
     
     # Get the objective value (profit)
     profit = pyo.value(model.obj)
@@ -193,6 +213,8 @@ for extra_material in range(0, 200, 5):  # Example range from 0 to 2000 in incre
     additional_materials.append(extra_material)
     profits.append(profit)
 
+timer.stop()
+
 # Plot the results
 plt.plot(additional_materials, profits, marker='o')
 plt.xlabel('Additional Material (lbs)')
@@ -210,6 +232,9 @@ print(f"Maximum willingness to pay per additional unit of material: ${max(margin
 
 
 
+print(timer.log_line())
+
+
 # NOTE: To switch the model to our own understanding, go to Demand Constraint function and change:
     # sum(model.ship[p, r, c] * sales_price[c][r]  for p in plants) <= demand[c][r] 
     # to become -> sum(model.ship[p, r, c] for p in plants) <= demand[c][r] 
\ No newline at end of file
@@ -1,5 +1,15 @@
 import pyomo.environ as pyo
 import pandas as pd
+import os
+import sys
+
+# phase_timer.py and solver_race.py live in the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from phase_timer import PhaseTimer
+from solver_race import SolverRace, configure_solver
+
+timer = PhaseTimer('Code 3')
+timer.start('build')
 
 # Initialize model
 model = pyo.ConcreteModel()
@@ -104,14 +114,22 @@ model.inspection_constraint = pyo.Constraint(rule=inspection_constraint)
 
 # model.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
 
+# Model size and the LP file a shell solver would write
+timer.stop()
+timer.record_model(model)
+timer.write_lp(model)
+
 # Solve the model
 opt = pyo.SolverFactory('cbc', executable='C:\\bin\\cbc.exe')
+# or race the solvers installed on PATH (GLPK, CBC, HiGHS), the first proven optimum wins:
+# opt = SolverRace()
 # opt = pyo.SolverFactory('IPOPT')
 #opt = pyo.SolverFactory('gurobi')
-results = opt.solve(model)
+results = timer.solve(opt, model)
 #model.pprint()
 
 # Extract results
+timer.start('extract')
 production_plan = pd.DataFrame([(p, r, pyo.value(model.prod[p, r])) for p in plants for r in products], columns=['Plant', 'Product', 'Production'])
 shipping_plan = pd.DataFrame([(p, r, c, pyo.value(model.ship[p, r, c])) for p in plants for r in products for c in customers], columns=['Plant', 'Product', 'Customer', 'Shipping'])
 
@@ -149,6 +167,8 @@ plant_revenue = shipping_plan.groupby('Plant')['Revenue'].sum()
 plant_total_cost = plant_production_cost + plant_shipping_cost
 plant_net_revenue = plant_revenue - plant_total_cost
 
+timer.stop()
+
 #Print the costs and revenues for each plant
 # print("\nCosts and Revenues for Each Plant")
 # for plant in plants:
@@ -172,13 +192,19 @@ profits = []
 
 
 
+# Persistent alternative: rhs_sweep(build_model(), 'inspection', range(0, 5000, 100)) from vision_model.py
+# keeps the model loaded in HiGHS and only changes the right-hand side between solves
+# A race runs once, on the base model; the 50 re-solves below use its winner alone
+if isinstance(opt, SolverRace):
+    opt = configure_solver(opt.winner)
+timer.start('sensitivity')
 for extra_capacity in range(0, 5000, 100):  # Example range from 0 to 2000 in increments of 100
     # Modify the material constraint
     model.del_component(model.inspection_constraint)
     model.inspection_constraint = pyo.Constraint(expr=sum(model.ship[p, r, c] for p in [1, 2] for r in products for c in ['RAYco', 'HONco']) <= inspection_capacity + extra_capacity)
     
     # Solve the model
-    results = opt.solve(model)
+    results = timer.solve(opt, model)
     
     # Get the objective value (profit)
     profit = pyo.value(model.obj)
@@ -187,6 +213,8 @@ for extra_capacity in range(0, 5000, 100):  # Example range from 0 to 2000 in in
     additional_capacity.append(extra_capacity)
     profits.append(profit)
 
+timer.stop()
+
 # Plot the results
 plt.plot(additional_capacity, profits, marker='o')
 plt.xlabel('Additional Capacity (lbs)')
@@ -201,3 +229,5 @@ optimal_capacity_index = marginal_values.index(max(marginal_values))
 
 print(f"Optimal additional capacity: {additional_capacity[optimal_capacity_index]} lbs")
 print(f"Maximum willingness to pay per additional unit of capacity: ${max(marginal_values):,.2f}")
+
+print(timer.log_line())
@@ -1,8 +1,13 @@
 import pyomo.environ as pyo
 import pandas as pd
+import os
+import sys
 
-# Initialize model
-model = pyo.ConcreteModel()
+# phase_timer.py lives in the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from phase_timer import PhaseTimer
+
+timer = PhaseTimer('Code 4')
 
 # Define sets
 plants = [1, 2, 3]
@@ -58,186 +63,201 @@ demand = {
 
 inspection_capacity = 1500
 
-# Decision Variables
-model.prod = pyo.Var(plants, products, within=pyo.NonNegativeIntegers)
-model.ship = pyo.Var(plants, products, customers, within=pyo.NonNegativeIntegers)
-
-# Objective function: Maximize profit
-def objective_rule(model):
-    revenue = sum(model.ship[p, r, c] * sales_price[c][r] for p in plants for r in products for c in customers)
-    production_costs = sum(model.prod[p, r] * production_cost[p][r] for p in plants for r in products)
-    shipping_costs = sum(model.ship[p, r, c] * shipping_cost[(p, c)] for p in plants for r in products for c in customers)
-    return revenue - production_costs - shipping_costs
-
-model.obj = pyo.Objective(rule=objective_rule, sense=pyo.maximize)
-
-# Constraints
-# Labor capacity constraints
-def labor_constraint(model, p):
-    return sum(model.prod[p, r] * labor_hours[p][r] for r in products) <= labor_capacity[p]
-model.labor_constraint = pyo.Constraint(plants, rule=labor_constraint)
-
-# Machine capacity constraints
-def machine_constraint(model, p):
-    return sum(model.prod[p, r] * machine_hours[p][r] for r in products) <= machine_capacity[p]
-model.machine_constraint = pyo.Constraint(plants, rule=machine_constraint)
-
-# Material constraints
-def material_constraint(model):
-    return sum(model.prod[p, r] * material[p][r] for p in plants for r in products) <= total_material
-model.material_constraint = pyo.Constraint(rule=material_constraint)
-
-# Demand satisfaction
-def demand_constraint(model, c, r):
-    return sum(model.ship[p, r, c] for p in plants) <= demand[c][r] 
-model.demand_constraint = pyo.Constraint(customers, products, rule=demand_constraint)
-
-# Production balance
-def production_balance_constraint(model, p, r):
-    return sum(model.ship[p, r, c] for c in customers) == model.prod[p, r]
-model.production_balance_constraint = pyo.Constraint(plants, products, rule=production_balance_constraint)
-
-# Special inspection capacity
-def inspection_constraint(model):
-    return sum(model.ship[p, r, c] for p in [1, 2] for r in products for c in ['RAYco', 'HONco']) <= inspection_capacity
-model.inspection_constraint = pyo.Constraint(rule=inspection_constraint)
-
-model.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
-
-# Solve the model
-# opt = pyo.SolverFactory('cbc', executable='C:\\bin\\cbc.exe')
-opt = pyo.SolverFactory('IPOPT')
-#opt = pyo.SolverFactory('gurobi')
-results = opt.solve(model)
-# model.pprint()
-
-
-#display all duals
-print("Duals for Machine Constraints")
-for n, c in enumerate(model.component_objects(pyo.Constraint, active=True)):
-    if n != 1: #print only machine constraint
-        continue
-   
-    print("   Constraint", c)
-    for index in c:
-        print("      ", index, model.dual[c[index]])
-
-# Extract results
-production_plan = pd.DataFrame([(p, r, pyo.value(model.prod[p, r])) for p in plants for r in products], columns=['Plant', 'Product', 'Production'])
-shipping_plan = pd.DataFrame([(p, r, c, pyo.value(model.ship[p, r, c])) for p in plants for r in products for c in customers], columns=['Plant', 'Product', 'Customer', 'Shipping'])
-
-# print(production_plan)
-# print(shipping_plan)
-
-production_contingency_table = production_plan.pivot(index='Plant', columns='Product', values='Production')
-shipping_contingency_table = shipping_plan.pivot_table(index=['Plant', 'Product'], columns='Customer', values='Shipping', aggfunc='sum')
-
-# print("\nProduction Contingency Table")
-# print(production_contingency_table)
-
-# print("\nShipping Contingency Table")
-# print(shipping_contingency_table)
-
-print("Objective value:", pyo.value(model.obj))
-
-# Calculate the cost and revenue generated from each plant
-production_costs = production_plan.apply(lambda row: row['Production'] * production_cost[row['Plant']][row['Product']], axis=1)
-shipping_costs = shipping_plan.apply(lambda row: row['Shipping'] * shipping_cost[(row['Plant'], row['Customer'])], axis=1)
-revenues = shipping_plan.apply(lambda row: row['Shipping'] * sales_price[row['Customer']][row['Product']], axis=1)
-
-# Sum production and shipping costs, and revenue for each plant
-production_plan['Production Cost'] = production_costs
-shipping_plan['Shipping Cost'] = shipping_costs
-shipping_plan['Revenue'] = revenues
-
-# Aggregate costs and revenue by plant
-plant_production_cost = production_plan.groupby('Plant')['Production Cost'].sum()
-plant_shipping_cost = shipping_plan.groupby('Plant')['Shipping Cost'].sum()
-plant_revenue = shipping_plan.groupby('Plant')['Revenue'].sum()
-
-# Calculate total cost and net revenue for each plant
-plant_total_cost = plant_production_cost + plant_shipping_cost
-plant_net_revenue = plant_revenue - plant_total_cost
-
-# #Print the costs and revenues for each plant
-# print("\nCosts and Revenues for Each Plant")
-# for plant in plants:
-#     print(f"Plant {plant}:")
-#     print(f"  Production Cost: ${plant_production_cost[plant]:,.2f}")
-#     print(f"  Shipping Cost: ${plant_shipping_cost[plant]:,.2f}")
-#     print(f"  Total Cost: ${plant_total_cost[plant]:,.2f}")
-#     print(f"  Revenue: ${plant_revenue[plant]:,.2f}")
-#     print(f"  Net Revenue: ${plant_net_revenue[plant]:,.2f}\n")
+
+# Base case: build the model, solve it with IPOPT, print the machine-constraint duals and the plant results.
+# In a function, so the sweep's worker processes that re-import this script do not redo it
+def solve_base_case():
+    timer.start('build')
+
+    # Initialize model
+    model = pyo.ConcreteModel()
+
+    # Decision Variables
+    model.prod = pyo.Var(plants, products, within=pyo.NonNegativeIntegers)
+    model.ship = pyo.Var(plants, products, customers, within=pyo.NonNegativeIntegers)
+
+    # Objective function: Maximize profit
+    def objective_rule(model):
+        revenue = sum(model.ship[p, r, c] * sales_price[c][r] for p in plants for r in products for c in customers)
+        production_costs = sum(model.prod[p, r] * production_cost[p][r] for p in plants for r in products)
+        shipping_costs = sum(model.ship[p, r, c] * shipping_cost[(p, c)] for p in plants for r in products for c in customers)
+        return revenue - production_costs - shipping_costs
+
+    model.obj = pyo.Objective(rule=objective_rule, sense=pyo.maximize)
+
+    # Constraints
+    # Labor capacity constraints
+    def labor_constraint(model, p):
+        return sum(model.prod[p, r] * labor_hours[p][r] for r in products) <= labor_capacity[p]
+    model.labor_constraint = pyo.Constraint(plants, rule=labor_constraint)
+
+    # Machine capacity constraints
+    def machine_constraint(model, p):
+        return sum(model.prod[p, r] * machine_hours[p][r] for r in products) <= machine_capacity[p]
+    model.machine_constraint = pyo.Constraint(plants, rule=machine_constraint)
+
+    # Material constraints
+    def material_constraint(model):
+        return sum(model.prod[p, r] * material[p][r] for p in plants for r in products) <= total_material
+    model.material_constraint = pyo.Constraint(rule=material_constraint)
+
+    # Demand satisfaction
+    def demand_constraint(model, c, r):
+        return sum(model.ship[p, r, c] for p in plants) <= demand[c][r] 
+    model.demand_constraint = pyo.Constraint(customers, products, rule=demand_constraint)
+
+    # Production balance
+    def production_balance_constraint(model, p, r):
+        return sum(model.ship[p, r, c] for c in customers) == model.prod[p, r]
+    model.production_balance_constraint = pyo.Constraint(plants, products, rule=production_balance_constraint)
+
+    # Special inspection capacity
+    def inspection_constraint(model):
+        return sum(model.ship[p, r, c] for p in [1, 2] for r in products for c in ['RAYco', 'HONco']) <= inspection_capacity
+    model.inspection_constraint = pyo.Constraint(rule=inspection_constraint)
+
+    model.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+
+    # Model size and the LP file a shell solver would write
+    timer.stop()
+    timer.record_model(model)
+    timer.write_lp(model)
+
+    # Solve the model
+    # opt = pyo.SolverFactory('cbc', executable='C:\\bin\\cbc.exe')
+    opt = pyo.SolverFactory('IPOPT')
+    #opt = pyo.SolverFactory('gurobi')
+    results = timer.solve(opt, model)
+    # model.pprint()
+
+
+    #display all duals
+    print("Duals for Machine Constraints")
+    for n, c in enumerate(model.component_objects(pyo.Constraint, active=True)):
+        if n != 1: #print only machine constraint
+            continue
+
+        print("   Constraint", c)
+        for index in c:
+            print("      ", index, model.dual[c[index]])
+
+    # For exact breakpoints instead of the 1-hour grid below, see lp_ranging() in vision_sensitivity.py
+
+    # Extract results
+    timer.start('extract')
+    production_plan = pd.DataFrame([(p, r, pyo.value(model.prod[p, r])) for p in plants for r in products], columns=['Plant', 'Product', 'Production'])
+    shipping_plan = pd.DataFrame([(p, r, c, pyo.value(model.ship[p, r, c])) for p in plants for r in products for c in customers], columns=['Plant', 'Product', 'Customer', 'Shipping'])
+
+    # print(production_plan)
+    # print(shipping_plan)
+
+    production_contingency_table = production_plan.pivot(index='Plant', columns='Product', values='Production')
+    shipping_contingency_table = shipping_plan.pivot_table(index=['Plant', 'Product'], columns='Customer', values='Shipping', aggfunc='sum')
+
+    # print("\nProduction Contingency Table")
+    # print(production_contingency_table)
+
+    # print("\nShipping Contingency Table")
+    # print(shipping_contingency_table)
+
+    print("Objective value:", pyo.value(model.obj))
+
+    # Calculate the cost and revenue generated from each plant
+    production_costs = production_plan.apply(lambda row: row['Production'] * production_cost[row['Plant']][row['Product']], axis=1)
+    shipping_costs = shipping_plan.apply(lambda row: row['Shipping'] * shipping_cost[(row['Plant'], row['Customer'])], axis=1)
+    revenues = shipping_plan.apply(lambda row: row['Shipping'] * sales_price[row['Customer']][row['Product']], axis=1)
+
+    # Sum production and shipping costs, and revenue for each plant
+    production_plan['Production Cost'] = production_costs
+    shipping_plan['Shipping Cost'] = shipping_costs
+    shipping_plan['Revenue'] = revenues
+
+    # Aggregate costs and revenue by plant
+    plant_production_cost = production_plan.groupby('Plant')['Production Cost'].sum()
+    plant_shipping_cost = shipping_plan.groupby('Plant')['Shipping Cost'].sum()
+    plant_revenue = shipping_plan.groupby('Plant')['Revenue'].sum()
+
+    # Calculate total cost and net revenue for each plant
+    plant_total_cost = plant_production_cost + plant_shipping_cost
+    plant_net_revenue = plant_revenue - plant_total_cost
+
+    timer.stop()
+
+    # #Print the costs and revenues for each plant
+    # print("\nCosts and Revenues for Each Plant")
+    # for plant in plants:
+    #     print(f"Plant {plant}:")
+    #     print(f"  Production Cost: ${plant_production_cost[plant]:,.2f}")
+    #     print(f"  Shipping Cost: ${plant_shipping_cost[plant]:,.2f}")
+    #     print(f"  Total Cost: ${plant_total_cost[plant]:,.2f}")
+    #     print(f"  Revenue: ${plant_revenue[plant]:,.2f}")
+    #     print(f"  Net Revenue: ${plant_net_revenue[plant]:,.2f}\n")
+
+    return model
 
 
 # Following is the code to generate profit result by adding machine resource, one run per an additional resource.
 
 import matplotlib.pyplot as plt
 
+from vision_model import parallel_sweep
+
+# Persistent alternative: rhs_sweep(build_model(), ('machine', p), range(0, 200)) from vision_model.py
+# keeps the model loaded in HiGHS and only changes the right-hand side between solves
 # Function to perform sensitivity analysis on machine hours
-def machine_hours_sensitivity_analysis():
+def machine_hours_sensitivity_analysis(workers=None):
     sensitivity_results = {}
-    
-    for p in [3,1,2]:
-        additional_hours = []
-        profits = []
-        
-        for extra_hours in range(0, 200, 1):  # Example range from 0 to 3000 in increments of 100
-            # Deactivate the existing machine constraint for plant p
-            model.machine_constraint[p].deactivate()
-            
-            # Create a new constraint name
-            constraint_name = f"machine_constraint_{p}"
-            
-            # Delete any existing constraint with the same name
-            if hasattr(model, constraint_name):
-                model.del_component(constraint_name)
-            
-            # Add the modified machine constraint for plant p
-            model.add_component(constraint_name, pyo.Constraint(expr=sum(model.prod[p, r] * machine_hours[p][r] for r in products) <= machine_capacity[p] + extra_hours))
-            
-            # Reactivate the modified machine constraint for plant p
-            getattr(model, constraint_name).activate()
-            
-            # Solve the model
-            results = opt.solve(model)
-            
-            # Get the objective value (profit)
-            profit = pyo.value(model.obj)
-            
-            # Store the additional hours and corresponding profit
-            additional_hours.append(extra_hours)
-            profits.append(profit)
-        
+
+    # Every (plant, extra hours) point is an independent solve on its own model copy,
+    # so the points run across a process pool and come back in the order submitted
+    sweep_plants = [3, 1, 2]
+    extra_hours_range = range(0, 200, 1)  # Example range from 0 to 3000 in increments of 100
+    points = [(('machine', p), extra_hours) for p in sweep_plants for extra_hours in extra_hours_range]
+    timer.start('sensitivity')
+    all_profits = parallel_sweep(points, solver='IPOPT', workers=workers)
+    timer.stop()
+
+    for n, p in enumerate(sweep_plants):
+        additional_hours = list(extra_hours_range)
+        profits = all_profits[n * len(extra_hours_range):(n + 1) * len(extra_hours_range)]
+
         # Store results for plant p
         sensitivity_results[p] = {
             'additional_hours': additional_hours,
             'profits': profits
         }
-        
+
         # Plot the results for plant p
         plt.plot(additional_hours, profits, marker='o', label=f'Plant {p}')
-    
+
     plt.xlabel('Additional Machine Hours')
     plt.ylabel('Profit ($)')
     plt.title('Sensitivity Analysis: Profit vs Additional Machine Hours')
     plt.legend()
     plt.grid(True)
     plt.show()
-    
+
     return sensitivity_results
 
-# Perform the sensitivity analysis
-sensitivity_results = machine_hours_sensitivity_analysis()
+# Number of worker processes for the sweep, None uses every core
+workers = None
+
+# Perform the sensitivity analysis (guarded so pool workers that re-import this script do not start it again)
+if __name__ == '__main__':
+    solve_base_case()
 
-# Analyze marginal values for willingness to pay
-for p in plants:
-    additional_hours = sensitivity_results[p]['additional_hours']
-    profits = sensitivity_results[p]['profits']
+    sensitivity_results = machine_hours_sensitivity_analysis(workers)
+
+    # Analyze marginal values for willingness to pay
+    for p in plants:
+        additional_hours = sensitivity_results[p]['additional_hours']
+        profits = sensitivity_results[p]['profits']
     
-    marginal_values = [(profits[i+1] - profits[i]) / 1 for i in range(len(profits)-1)]
-    optimal_hours_index = marginal_values.index(max(marginal_values))
+        marginal_values = [(profits[i+1] - profits[i]) / 1 for i in range(len(profits)-1)]
+        optimal_hours_index = marginal_values.index(max(marginal_values))
     
-    print(f"Plant {p}:")
-    print(f"  Optimal additional machine hours: {additional_hours[optimal_hours_index]} hours")
-    print(f"  Maximum willingness to pay per additional hour: ${max(marginal_values):,.2f}\n")
+        print(f"Plant {p}:")
+        print(f"  Optimal additional machine hours: {additional_hours[optimal_hours_index]} hours")
+        print(f"  Maximum willingness to pay per additional hour: ${max(marginal_values):,.2f}\n")
+
+    print(timer.log_line())
@@ -1,5 +1,15 @@
 import pyomo.environ as pyo
 import pandas as pd
+import os
+import sys
+
+# phase_timer.py and solver_race.py live in the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from phase_timer import PhaseTimer
+from solver_race import SolverRace
+
+timer = PhaseTimer('Code 5')
+timer.start('build')
 
 # Initialize model
 model = pyo.ConcreteModel()
@@ -50,6 +60,8 @@ shipping_cost = {
     (3, 'RAYco'): 1.4, (3, 'HONco'): 1.5, (3, 'MMco'): 1.3
 }
 
+# Code 1.py with RAYco's demand raised. For many demand, price or capacity what-ifs at once, list them
+# in a file like scenarios.csv and run: python vision_scenarios.py scenarios.csv (see vision_scenarios.py)
 demand = {
     'RAYco': {'Small': 300, 'Medium': 450, 'Large': 750, 'Precision': 300},
     'HONco': {'Small': 400, 'Medium': 300, 'Large': 200, 'Precision': 400},
@@ -102,15 +114,23 @@ def inspection_constraint(model):
     return sum(model.ship[p, r, c] for p in [1, 2] for r in products for c in ['RAYco', 'HONco']) <= inspection_capacity
 model.inspection_constraint = pyo.Constraint(rule=inspection_constraint)
 
+# Model size and the LP file a shell solver would write
+timer.stop()
+timer.record_model(model)
+timer.write_lp(model)
+
 # Solve the model
 opt = pyo.SolverFactory('cbc', executable='C:\\bin\\cbc.exe')
+# or race the solvers installed on PATH (GLPK, CBC, HiGHS), the first proven optimum wins:
+# opt = SolverRace()
 #opt = pyo.SolverFactory('gurobi')
-results = opt.solve(model)
+results = timer.solve(opt, model)
 model.pprint()
 
 
 
 # Extract results
+timer.start('extract')
 production_plan = pd.DataFrame([(p, r, pyo.value(model.prod[p, r])) for p in plants for r in products], columns=['Plant', 'Product', 'Production'])
 shipping_plan = pd.DataFrame([(p, r, c, pyo.value(model.ship[p, r, c])) for p in plants for r in products for c in customers], columns=['Plant', 'Product', 'Customer', 'Shipping'])
 
@@ -148,6 +168,8 @@ plant_revenue = shipping_plan.groupby('Plant')['Revenue'].sum()
 plant_total_cost = plant_production_cost + plant_shipping_cost
 plant_net_revenue = plant_revenue - plant_total_cost
 
+timer.stop()
+
 #Print the costs and revenues for each plant
 print("\nCosts and Revenues for Each Plant")
 for plant in plants:
@@ -157,3 +179,5 @@ for plant in plants:
     print(f"  Total Cost: ${plant_total_cost[plant]:,.2f}")
     print(f"  Revenue: ${plant_revenue[plant]:,.2f}")
     print(f"  Net Revenue: ${plant_net_revenue[plant]:,.2f}\n")
+
+print(timer.log_line())
@@ -0,0 +1,58 @@
+import sys
+import time
+
+import pyomo.environ as pyo
+
+from vision_model import build_model, customers, machine_capacity, machine_hours, material, plants, products, rhs_sweep, total_material, inspection_capacity
+
+
+# Solver for the current del_component approach, e.g. python benchmark_sweep.py cbc
+solver = sys.argv[1] if len(sys.argv) > 1 else 'cbc'
+
+
+def replace_constraint(model, resource, extra):
+    # The current approach of Code 2.py, Code 3.py and Code 4.py: delete and re-add the constraint
+    if resource == 'material':
+        model.del_component(model.material_constraint)
+        model.material_constraint = pyo.Constraint(expr=sum(model.prod[p, r] * material[p][r] for p in plants for r in products) <= total_material + extra)
+    elif resource == 'inspection':
+        model.del_component(model.inspection_constraint)
+        model.inspection_constraint = pyo.Constraint(expr=sum(model.ship[p, r, c] for p in [1, 2] for r in products for c in ['RAYco', 'HONco']) <= inspection_capacity + extra)
+    else:
+        p = resource[1]
+        model.machine_constraint[p].deactivate()
+        constraint_name = f"machine_constraint_{p}"
+        if hasattr(model, constraint_name):
+            model.del_component(constraint_name)
+        model.add_component(constraint_name, pyo.Constraint(expr=sum(model.prod[p, r] * machine_hours[p][r] for r in products) <= machine_capacity[p] + extra))
+
+
+def current_sweep(model, resource, extra_amounts):
+    opt = pyo.SolverFactory(solver)
+    profits = []
+    for extra in extra_amounts:
+        replace_constraint(model, resource, extra)
+        opt.solve(model)
+        profits.append(pyo.value(model.obj))
+    return profits
+
+
+if __name__ == '__main__':
+    # Same sweeps as the scripts; Code 4 solves with IPOPT, i.e. the continuous relaxation
+    sweeps = [
+        ('Code 2.py material', 'material', range(0, 200, 5), pyo.NonNegativeIntegers),
+        ('Code 3.py inspection', 'inspection', range(0, 5000, 100), pyo.NonNegativeIntegers),
+    ] + [(f'Code 4.py machine plant {p}', ('machine', p), range(0, 200, 1), pyo.NonNegativeReals) for p in [3, 1, 2]]
+
+    print(f"{'sweep':<28}{'solves':>8}{'current s':>11}{'persistent s':>14}{'speedup':>9}{'max diff':>10}")
+    for name, resource, extra_amounts, domain in sweeps:
+        start = time.perf_counter()
+        profits = current_sweep(build_model(domain=domain), resource, extra_amounts)
+        current_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = rhs_sweep(build_model(domain=domain), resource, extra_amounts)
+        persistent_time = time.perf_counter() - start
+
+        diff = max(abs(a - b) for a, b in zip(profits, results['Profit']))
+        print(f"{name:<28}{len(extra_amounts):>8}{current_time:>11.2f}{persistent_time:>14.2f}{current_time / persistent_time:>8.1f}x{diff:>10.2g}")
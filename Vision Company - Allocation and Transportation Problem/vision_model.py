@@ -0,0 +1,284 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+from pyomo.contrib.appsi.solvers import Highs
+
+
+# Define sets
+plants = [1, 2, 3]
+products = ['Small', 'Medium', 'Large', 'Precision']
+customers = ['RAYco', 'HONco', 'MMco']
+
+# Define parameters (same data as Code 1.py - Code 4.py)
+labor_hours = {
+    1: {'Small': 3, 'Medium': 3, 'Large': 4, 'Precision': 4},
+    2: {'Small': 3.5, 'Medium': 3.5, 'Large': 4.5, 'Precision': 4.5},
+    3: {'Small': 3, 'Medium': 3.5, 'Large': 4, 'Precision': 4.5}
+}
+
+machine_hours = {
+    1: {'Small': 8, 'Medium': 8.5, 'Large': 9, 'Precision': 9},
+    2: {'Small': 7, 'Medium': 7, 'Large': 8, 'Precision': 9},
+    3: {'Small': 7.5, 'Medium': 7.5, 'Large': 8.5, 'Precision': 8.5}
+}
+
+material = {
+    1: {'Small': 1.0, 'Medium': 1.1, 'Large': 1.2, 'Precision': 1.3},
+    2: {'Small': 1.1, 'Medium': 1.0, 'Large': 1.1, 'Precision': 1.4},
+    3: {'Small': 1.1, 'Medium': 1.1, 'Large': 1.3, 'Precision': 1.3}
+}
+
+labor_capacity = {1: 6000, 2: 5000, 3: 3000}
+machine_capacity = {1: 10000, 2: 12500, 3: 6000}
+total_material = 3500
+
+production_cost = {
+    1: {'Small': 14, 'Medium': 16, 'Large': 18, 'Precision': 26},
+    2: {'Small': 13, 'Medium': 17, 'Large': 20, 'Precision': 24},
+    3: {'Small': 14, 'Medium': 15, 'Large': 19, 'Precision': 23}
+}
+
+sales_price = {
+    'RAYco': {'Small': 17, 'Medium': 18, 'Large': 22, 'Precision': 29},
+    'HONco': {'Small': 16, 'Medium': 18, 'Large': 22, 'Precision': 26},
+    'MMco': {'Small': 16, 'Medium': 17, 'Large': 23, 'Precision': 27}
+}
+
+shipping_cost = {
+    (1, 'RAYco'): 1.0, (1, 'HONco'): 1.6, (1, 'MMco'): 1.1,
+    (2, 'RAYco'): 1.2, (2, 'HONco'): 1.5, (2, 'MMco'): 1.0,
+    (3, 'RAYco'): 1.4, (3, 'HONco'): 1.5, (3, 'MMco'): 1.3
+}
+
+demand = {
+    'RAYco': {'Small': 200, 'Medium': 300, 'Large': 500, 'Precision': 200},
+    'HONco': {'Small': 400, 'Medium': 300, 'Large': 200, 'Precision': 400},
+    'MMco': {'Small': 200, 'Medium': 400, 'Large': 300, 'Precision': 300}
+}
+
+inspection_capacity = 1500
+inspection_plants = [1, 2]
+inspection_customers = ['RAYco', 'HONco']
+
+
+def base_data():
+    # The case data above as one dict, in the form random_data() generates
+    return {
+        'plants': plants, 'products': products, 'customers': customers,
+        'labor_hours': labor_hours, 'machine_hours': machine_hours, 'material': material,
+        'labor_capacity': labor_capacity, 'machine_capacity': machine_capacity, 'total_material': total_material,
+        'production_cost': production_cost, 'sales_price': sales_price, 'shipping_cost': shipping_cost,
+        'demand': demand, 'inspection_capacity': inspection_capacity,
+        'inspection_plants': inspection_plants, 'inspection_customers': inspection_customers,
+    }
+
+
+def random_data(n_plants, n_products, n_customers, seed=0):
+    """Seeded synthetic Vision data of any size, with the same structure and value ranges as the case.
+
+    Capacities are scaled to the generated demand so labor, machine hours,
+    material and inspection stay binding as the instance grows.
+    """
+    rng = np.random.default_rng(seed)
+    plant_ids = list(range(1, n_plants + 1))
+    product_ids = [f'Product{r + 1}' for r in range(n_products)]
+    customer_ids = [f'Customer{c + 1}' for c in range(n_customers)]
+
+    def table(rows, cols, low, high, step):
+        values = np.round(rng.uniform(low, high, size=(len(rows), len(cols))) / step) * step
+        return {row: {col: float(values[a, b]) for b, col in enumerate(cols)} for a, row in enumerate(rows)}
+
+    unit_labor = table(plant_ids, product_ids, 3, 4.5, 0.5)
+    unit_machine = table(plant_ids, product_ids, 7, 9, 0.5)
+    unit_material = table(plant_ids, product_ids, 1.0, 1.4, 0.1)
+    unit_cost = table(plant_ids, product_ids, 13, 26, 1)
+    unit_demand = table(customer_ids, product_ids, 200, 500, 100)
+
+    # Prices cover the average production cost of the product plus a margin
+    average_cost = {r: np.mean([unit_cost[p][r] for p in plant_ids]) for r in product_ids}
+    price = {c: {r: float(round(average_cost[r] + rng.uniform(1, 6))) for r in product_ids} for c in customer_ids}
+    shipping = {(p, c): float(round(rng.uniform(1.0, 1.6), 1)) for p in plant_ids for c in customer_ids}
+
+    product_demand = {r: sum(unit_demand[c][r] for c in customer_ids) for r in product_ids}
+
+    def capacity(unit):
+        # Hours to make all demand, split over the plants and cut to 50-100%
+        hours = sum(product_demand[r] * np.mean([unit[p][r] for p in plant_ids]) for r in product_ids) / n_plants
+        return {p: float(round(hours * rng.uniform(0.5, 1.0))) for p in plant_ids}
+
+    checked_plants = plant_ids[:max(1, (2 * n_plants) // 3)]
+    checked_customers = customer_ids[:max(1, (2 * n_customers) // 3)]
+    return {
+        'plants': plant_ids, 'products': product_ids, 'customers': customer_ids,
+        'labor_hours': unit_labor, 'machine_hours': unit_machine, 'material': unit_material,
+        'labor_capacity': capacity(unit_labor), 'machine_capacity': capacity(unit_machine),
+        'total_material': float(round(0.6 * sum(product_demand.values()) * 1.2)),
+        'production_cost': unit_cost, 'sales_price': price, 'shipping_cost': shipping,
+        'demand': unit_demand,
+        'inspection_capacity': float(round(0.3 * sum(unit_demand[c][r] for c in checked_customers for r in product_ids))),
+        'inspection_plants': checked_plants, 'inspection_customers': checked_customers,
+    }
+
+
+def build_model(demand=None, domain=pyo.NonNegativeIntegers, data=None):
+    """The Vision production and shipping model of Code 1.py, with the same component names.
+
+    Capacities (labor and machine hours per plant, material, inspection),
+    demand and sales prices are mutable parameters, so a sweep or a scenario
+    (vision_scenarios.py) changes only values in an already built model. Pass
+    domain=pyo.NonNegativeReals for the LP relaxation, and `data` from
+    random_data() for a synthetic instance instead of the case data.
+    """
+    data = base_data() if data is None else data
+    demand = data['demand'] if demand is None else demand
+    plants, products, customers = data['plants'], data['products'], data['customers']
+    labor_hours, machine_hours, material = data['labor_hours'], data['machine_hours'], data['material']
+    production_cost, shipping_cost = data['production_cost'], data['shipping_cost']
+
+    # Initialize model
+    model = pyo.ConcreteModel()
+
+    # Resources varied by the sensitivity analyses and scenarios
+    model.total_material = pyo.Param(initialize=data['total_material'], mutable=True)
+    model.inspection_capacity = pyo.Param(initialize=data['inspection_capacity'], mutable=True)
+    model.machine_capacity = pyo.Param(plants, initialize=data['machine_capacity'], mutable=True)
+    model.labor_capacity = pyo.Param(plants, initialize=data['labor_capacity'], mutable=True)
+
+    # Market data varied by the scenarios
+    model.demand = pyo.Param(customers, products, initialize={(c, r): demand[c][r] for c in customers for r in products}, mutable=True)
+    model.sales_price = pyo.Param(customers, products, initialize={(c, r): data['sales_price'][c][r] for c in customers for r in products}, mutable=True)
+
+    # Decision Variables
+    model.prod = pyo.Var(plants, products, within=domain)
+    model.ship = pyo.Var(plants, products, customers, within=domain)
+
+    # Objective function: Maximize profit
+    def objective_rule(model):
+        revenue = sum(model.ship[p, r, c] * model.sales_price[c, r] for p in plants for r in products for c in customers)
+        production_costs = sum(model.prod[p, r] * production_cost[p][r] for p in plants for r in products)
+        shipping_costs = sum(model.ship[p, r, c] * shipping_cost[(p, c)] for p in plants for r in products for c in customers)
+        return revenue - production_costs - shipping_costs
+
+    model.obj = pyo.Objective(rule=objective_rule, sense=pyo.maximize)
+
+    # Constraints
+    # Labor capacity constraints
+    def labor_constraint(model, p):
+        return sum(model.prod[p, r] * labor_hours[p][r] for r in products) <= model.labor_capacity[p]
+    model.labor_constraint = pyo.Constraint(plants, rule=labor_constraint)
+
+    # Machine capacity constraints
+    def machine_constraint(model, p):
+        return sum(model.prod[p, r] * machine_hours[p][r] for r in products) <= model.machine_capacity[p]
+    model.machine_constraint = pyo.Constraint(plants, rule=machine_constraint)
+
+    # Material constraints
+    def material_constraint(model):
+        return sum(model.prod[p, r] * material[p][r] for p in plants for r in products) <= model.total_material
+    model.material_constraint = pyo.Constraint(rule=material_constraint)
+
+    # Demand satisfaction
+    def demand_constraint(model, c, r):
+        return sum(model.ship[p, r, c] for p in plants) <= model.demand[c, r]
+    model.demand_constraint = pyo.Constraint(customers, products, rule=demand_constraint)
+
+    # Production balance
+    def production_balance_constraint(model, p, r):
+        return sum(model.ship[p, r, c] for c in customers) == model.prod[p, r]
+    model.production_balance_constraint = pyo.Constraint(plants, products, rule=production_balance_constraint)
+
+    # Special inspection capacity
+    def inspection_constraint(model):
+        return sum(model.ship[p, r, c] for p in data['inspection_plants'] for r in products for c in data['inspection_customers']) <= model.inspection_capacity
+    model.inspection_constraint = pyo.Constraint(rule=inspection_constraint)
+
+    return model
+
+
+def extract_plans(model):
+    # Production and shipping plan tables of a solved model, as in the scripts
+    production_plan = pd.DataFrame([(p, r, pyo.value(model.prod[p, r])) for (p, r) in model.prod], columns=['Plant', 'Product', 'Production'])
+    shipping_plan = pd.DataFrame([(p, r, c, pyo.value(model.ship[p, r, c])) for (p, r, c) in model.ship], columns=['Plant', 'Product', 'Customer', 'Shipping'])
+    return production_plan, shipping_plan
+
+
+def resource_param(model, resource):
+    # 'material', 'inspection' or ('machine', plant) -> the mutable parameter on the right-hand side
+    if resource == 'material':
+        return model.total_material
+    if resource == 'inspection':
+        return model.inspection_capacity
+    if isinstance(resource, tuple) and resource[0] == 'machine':
+        return model.machine_capacity[resource[1]]
+    raise ValueError(f"Unknown resource {resource!r}, expected 'material', 'inspection' or ('machine', plant)")
+
+
+def persistent_highs(model):
+    # HiGHS holding the model in memory; between solves only mutable parameter values are re-sent
+    opt = Highs()
+    if not opt.available():
+        raise RuntimeError('HiGHS is not available, install highspy')
+    for check in ['check_for_new_or_removed_constraints', 'check_for_new_or_removed_vars',
+                  'check_for_new_or_removed_params', 'check_for_new_objective',
+                  'update_constraints', 'update_vars', 'update_named_expressions', 'update_objective']:
+        setattr(opt.update_config, check, False)
+    opt.set_instance(model)
+    return opt
+
+
+def rhs_sweep(model, resource, extra_amounts, opt=None):
+    """Profit for each extra amount of one resource, re-solving a single loaded model.
+
+    The model is loaded into a persistent HiGHS instance once; each step only
+    updates the right-hand side of the matching constraint, and for an LP
+    HiGHS restarts from the previous optimal basis. The resource is restored
+    to its base value afterwards.
+
+    Returns a table with the extra amount, profit and seconds per solve.
+    """
+    param = resource_param(model, resource)
+    base = pyo.value(param)
+    if opt is None:
+        opt = persistent_highs(model)
+
+    rows = []
+    for extra in extra_amounts:
+        start = time.perf_counter()
+        param.set_value(base + extra)
+        results = opt.solve(model)
+        rows.append({'Extra': extra, 'Profit': results.best_feasible_objective, 'Seconds': time.perf_counter() - start})
+
+    param.set_value(base)
+    return pd.DataFrame(rows)
+
+
+def solve_point(point, solver='ipopt', domain=pyo.NonNegativeIntegers):
+    # One independent sweep point (resource, extra): its own model copy, solved from scratch
+    resource, extra = point
+    model = build_model(domain=domain)
+    param = resource_param(model, resource)
+    param.set_value(pyo.value(param) + extra)
+    pyo.SolverFactory(solver).solve(model)
+    return pyo.value(model.obj)
+
+
+def parallel_sweep(points, solver='ipopt', domain=pyo.NonNegativeIntegers, workers=None):
+    """Profit for every (resource, extra) point, solved across a process pool.
+
+    Each point builds and solves its own model, so no state is shared between
+    points and the order they run in does not matter. Profits come back in
+    the order of `points`. `workers` defaults to the number of CPUs, and
+    workers=1 solves in this process.
+    """
+    solve = partial(solve_point, solver=solver, domain=domain)
+    if workers == 1:
+        return [solve(point) for point in points]
+
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(solve, points, chunksize=max(1, len(points) // (4 * workers))))
@@ -0,0 +1,146 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyomo.environ as pyo
+
+from vision_model import build_model, persistent_highs
+
+
+# Mutable parameters of build_model a scenario may set, e.g. demand[RAYco,Small] or labor_capacity[1]
+SCENARIO_PARAMETERS = ['demand', 'sales_price', 'labor_capacity', 'machine_capacity', 'total_material', 'inspection_capacity']
+
+# State of one worker process: the model it built once, re-solved for every scenario it gets
+_worker = {}
+
+
+def load_scenarios(path):
+    """Scenarios from a CSV or Excel file, one row per scenario.
+
+    A 'Scenario' column names each row; every other column is one parameter
+    value in Pyomo's notation, e.g. demand[RAYco,Small], sales_price[MMco,Large],
+    machine_capacity[3] or total_material (quoted in a CSV header where the
+    label has a comma). Empty cells keep the case value.
+    Returns a list of dicts for run_scenarios().
+    """
+    table = pd.read_excel(path) if str(path).endswith('.xlsx') else pd.read_csv(path)
+    if 'Scenario' not in table:
+        table.insert(0, 'Scenario', range(1, len(table) + 1))
+    return [{name: value for name, value in row.items() if name == 'Scenario' or pd.notna(value)}
+            for row in table.to_dict('records')]
+
+
+def _parameter(model, name):
+    # The mutable parameter a scenario column names, a ValueError for anything else
+    try:
+        component = model.find_component(name)
+    except Exception:
+        # Labels Pyomo cannot parse, e.g. unbalanced brackets
+        component = None
+    if component is None or component.parent_component().local_name not in SCENARIO_PARAMETERS or component.is_indexed():
+        raise ValueError(f"Unknown scenario parameter {name!r}, expected one of {', '.join(SCENARIO_PARAMETERS)} "
+                         f"with its index, e.g. demand[RAYco,Small]")
+    return component
+
+
+def _init_worker(data, domain, solver, model=None):
+    if model is None:
+        model = build_model(domain=domain, data=data)
+    base = [(param, pyo.value(param)) for name in SCENARIO_PARAMETERS for param in getattr(model, name).values()]
+    if solver == 'highs':
+        # Loaded into HiGHS once, a scenario only re-sends the parameter values
+        opt = persistent_highs(model)
+        opt.config.load_solution = False
+    else:
+        opt = pyo.SolverFactory(solver)
+    _worker.update(model=model, base=base, opt=opt, solver=solver)
+
+
+def _solve(model):
+    # (feasible, status) of one solve, the solution loaded when there is one
+    if _worker['solver'] == 'highs':
+        results = _worker['opt'].solve(model)
+        feasible = results.best_feasible_objective is not None
+        if feasible:
+            results.solution_loader.load_vars()
+        return feasible, results.termination_condition.name
+    results = _worker['opt'].solve(model, load_solutions=False)
+    feasible = len(results.solution) > 0
+    if feasible:
+        model.solutions.load_from(results)
+    return feasible, str(results.solver.termination_condition)
+
+
+def _solve_scenario(scenario):
+    # Parameters a scenario leaves out take the case value, not the previous scenario's
+    model = _worker['model']
+    for param, value in _worker['base']:
+        param.set_value(value)
+    changes = {name: value for name, value in scenario.items() if name != 'Scenario'}
+    for name, value in changes.items():
+        _parameter(model, name).set_value(value)
+
+    start = time.perf_counter()
+    feasible, status = _solve(model)
+    row = {'Scenario': scenario.get('Scenario'), 'Feasible': feasible, 'Status': status, 'Seconds': time.perf_counter() - start}
+    if feasible:
+        row['Profit'] = pyo.value(model.obj)
+        for (p, r), var in model.prod.items():
+            row[f'Production {p} {r}'] = var.value
+
+        # Capacity, demand and inspection limits the plan uses up
+        binding = []
+        for constraint in model.component_data_objects(pyo.Constraint, active=True):
+            if not constraint.equality and pyo.value(constraint.upper) - pyo.value(constraint.body) <= 1e-6 * max(1.0, abs(pyo.value(constraint.upper))):
+                binding.append(constraint.name)
+        row['Binding'] = ', '.join(binding)
+    return row
+
+
+def run_scenarios(scenarios, data=None, solver='highs', domain=pyo.NonNegativeIntegers, workers=None):
+    """Profit, production plan and binding constraints of the Vision model for every scenario.
+
+    `scenarios` is a list of dicts of parameter values by name (see
+    load_scenarios), with an optional 'Scenario' label. Each worker process
+    builds the model once from `data` (the case data by default) and only
+    changes the mutable parameters between solves; solver='highs' keeps the
+    model loaded in a persistent HiGHS instance, any other name is passed to
+    SolverFactory. `workers` defaults to the number of CPUs, and workers=1
+    solves in this process.
+
+    Returns one row per scenario, in the order given: Scenario, Feasible,
+    solver Status, Seconds, Profit, one Production column per plant and
+    product, and the names of the binding constraints.
+    """
+    # Misspelled parameter names fail here, not in every worker
+    model = build_model(domain=domain, data=data)
+    for scenario in scenarios:
+        for name in scenario:
+            if name != 'Scenario':
+                _parameter(model, name)
+
+    if workers == 1:
+        _init_worker(data, domain, solver, model=model)
+        rows = [_solve_scenario(scenario) for scenario in scenarios]
+    else:
+        workers = workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data, domain, solver)) as pool:
+            rows = list(pool.map(_solve_scenario, scenarios, chunksize=max(1, len(scenarios) // (4 * workers))))
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    import sys
+
+    # e.g. python vision_scenarios.py scenarios.csv 4 results.csv
+    path = sys.argv[1] if len(sys.argv) > 1 else 'scenarios.csv'
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    table = run_scenarios(load_scenarios(path), workers=workers)
+    pd.set_option('display.width', 200)
+    print(table.to_string(index=False))
+    print(f"\n{(~table['Feasible']).sum()} of {len(table)} scenarios are infeasible")
+    if len(sys.argv) > 3:
+        table.to_csv(sys.argv[3], index=False)
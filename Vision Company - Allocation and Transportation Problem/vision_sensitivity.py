@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+from pyomo.repn.plugins.standard_form import LinearStandardFormCompiler
+
+try:
+    import highspy
+except ImportError:  # ranging needs HiGHS, the rest of the Vision code does not
+    highspy = None
+
+
+def _load_highs(model):
+    # Compile the Pyomo LP into matrix form and pass it to HiGHS unchanged (same sense, row per constraint)
+    info = LinearStandardFormCompiler().write(model, mixed_form=True, set_sense=None)
+    integer_vars = [v.name for v in info.columns if v.is_integer()]
+    if integer_vars:
+        raise ValueError(f'Ranging needs an LP, build the model with domain=pyo.NonNegativeReals ({len(integer_vars)} integer variables found)')
+
+    objective = info.objectives[0]
+    A = info.A.tocsc()
+    lp = highspy.HighsLp()
+    lp.num_col_, lp.num_row_ = A.shape[1], A.shape[0]
+    lp.col_cost_ = info.c.toarray()[0]
+    lp.offset_ = float(info.c_offset[0])
+    lp.col_lower_ = np.array([-highspy.kHighsInf if v.lb is None else v.lb for v in info.columns], dtype=float)
+    lp.col_upper_ = np.array([highspy.kHighsInf if v.ub is None else v.ub for v in info.columns], dtype=float)
+
+    # bound_type: 1 is expr <= rhs, -1 is expr >= rhs, 0 is expr == rhs
+    rhs = np.asarray(info.rhs, dtype=float)
+    bound_type = np.array([row.bound_type for row in info.rows])
+    lp.row_lower_ = np.where(bound_type <= 0, rhs, -highspy.kHighsInf)
+    lp.row_upper_ = np.where(bound_type >= 0, rhs, highspy.kHighsInf)
+
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    lp.a_matrix_.start_ = A.indptr
+    lp.a_matrix_.index_ = A.indices
+    lp.a_matrix_.value_ = A.data
+    lp.sense_ = highspy.ObjSense.kMaximize if objective.sense == pyo.maximize else highspy.ObjSense.kMinimize
+
+    h = highspy.Highs()
+    h.setOptionValue('output_flag', False)
+    h.passModel(lp)
+    return h, info, rhs, bound_type
+
+
+def lp_ranging(model):
+    """Shadow prices, reduced costs and their validity ranges from one LP solve.
+
+    The model is solved once with HiGHS and the optimal basis is ranged:
+    for every constraint the dual value and how far its right-hand side may
+    rise or fall before the basis (and therefore the dual) changes, and for
+    every variable its reduced cost and how far its objective coefficient
+    may move before the optimal solution changes. Allowable increases and
+    decreases are distances from the current value, inf when unbounded.
+
+    Returns (objective value, constraint table, variable table).
+    """
+    if highspy is None:
+        raise ImportError('lp_ranging needs highspy, install it with pip install highspy')
+
+    h, info, rhs, bound_type = _load_highs(model)
+    h.run()
+    if h.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+        raise RuntimeError(f'LP not solved to optimality: {h.modelStatusToString(h.getModelStatus())}')
+
+    solution = h.getSolution()
+    status, ranging = h.getRanging()
+    if status != highspy.HighsStatus.kOk:
+        raise RuntimeError('HiGHS could not range the optimal basis')
+
+    def distance(bound, current, direction):
+        # Gap from the current value to a ranging bound, inf where HiGHS reports none
+        return np.where(np.abs(bound) >= highspy.kHighsInf, np.inf, direction * (np.asarray(bound) - current))
+
+    allowable_increase = distance(ranging.row_bound_up.value_, rhs, 1)
+    allowable_decrease = distance(ranging.row_bound_dn.value_, rhs, -1)
+
+    # Rows with slack are basic, HiGHS ranges their activity rather than the
+    # right-hand side: the bound can move freely away from the activity and
+    # towards it until the slack is used up, with a zero shadow price throughout
+    slack = rhs - np.asarray(solution.row_value)
+    basic = np.array([status == highspy.HighsBasisStatus.kBasic for status in h.getBasis().row_status])
+    allowable_increase = np.where(basic & (bound_type == 1), np.inf, allowable_increase)
+    allowable_decrease = np.where(basic & (bound_type == 1), slack, allowable_decrease)
+    allowable_increase = np.where(basic & (bound_type == -1), -slack, allowable_increase)
+    allowable_decrease = np.where(basic & (bound_type == -1), np.inf, allowable_decrease)
+
+    constraint_table = pd.DataFrame({
+        'Constraint': [row.constraint.name for row in info.rows],
+        'Activity': solution.row_value,
+        'RHS': rhs,
+        'Shadow Price': solution.row_dual,
+        'Allowable Increase': allowable_increase,
+        'Allowable Decrease': allowable_decrease,
+    })
+
+    # Cost ranging arrays also carry entries for the row slacks after the columns
+    cost = info.c.toarray()[0]
+    n_cols = len(cost)
+    variable_table = pd.DataFrame({
+        'Variable': [v.name for v in info.columns],
+        'Value': solution.col_value,
+        'Reduced Cost': solution.col_dual,
+        'Objective Coefficient': cost,
+        'Allowable Increase': distance(ranging.col_cost_up.value_[:n_cols], cost, 1),
+        'Allowable Decrease': distance(ranging.col_cost_dn.value_[:n_cols], cost, -1),
+    })
+
+    return h.getInfo().objective_function_value, constraint_table, variable_table
+
+
+if __name__ == '__main__':
+    from vision_model import build_model
+
+    # One LP solve replaces the material (Code 2.py), inspection (Code 3.py) and machine hours (Code 4.py) grid searches
+    objective_value, constraint_table, variable_table = lp_ranging(build_model(domain=pyo.NonNegativeReals))
+    pd.set_option('display.width', 200)
+    print("Objective value:", objective_value)
+
+    print("\nConstraint Ranging (shadow price = willingness to pay per unit within the allowable range)")
+    print(constraint_table.to_string(index=False))
+
+    print("\nVariable Ranging")
+    print(variable_table.to_string(index=False))
@@ -0,0 +1,186 @@
+"""Scaling benchmark for the hub, Vision and Beef models on seeded synthetic instances.
+
+Each instance of the size ladder runs in a fresh process and records the
+time of every phase (data load, model build, solver write, solve,
+extraction), variable/constraint counts, LP file size and peak memory.
+Records are printed as a table and appended as JSON lines for comparing runs:
+
+    python benchmark_suite.py --models hub vision --steps 3 --solver cbc --output runs.jsonl
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+import pandas as pd
+import pyomo.environ as pyo
+from pyomo.version import version as pyomo_version
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FOLDERS = {
+    'hub': 'Multi_Allocation_Hub_Location_Problem',
+    'vision': 'Vision Company - Allocation and Transportation Problem',
+    'beef': 'Beef Distribution Network in Bogor - Transshipment Problem',
+}
+for folder in FOLDERS.values():
+    sys.path.insert(0, os.path.join(ROOT, folder))
+
+try:
+    import resource
+except ImportError:  # Windows has no getrusage, peak RSS is then left out
+    resource = None
+
+
+# Size ladder per model, smallest first; the first step is about the size of the repo's own data
+LADDERS = {
+    'hub': [{'n_nodes': 8, 'n_hubs': 5, 'p': 3}, {'n_nodes': 12, 'n_hubs': 6, 'p': 3},
+            {'n_nodes': 16, 'n_hubs': 8, 'p': 3}, {'n_nodes': 25, 'n_hubs': 10, 'p': 4},
+            {'n_nodes': 40, 'n_hubs': 12, 'p': 4}],
+    'vision': [{'n_plants': 3, 'n_products': 4, 'n_customers': 3}, {'n_plants': 5, 'n_products': 8, 'n_customers': 6},
+               {'n_plants': 10, 'n_products': 15, 'n_customers': 10}, {'n_plants': 20, 'n_products': 30, 'n_customers': 25},
+               {'n_plants': 40, 'n_products': 60, 'n_customers': 50}],
+    'beef': [{'n_origins': 8, 'n_hubs': 3, 'n_destinations': 6}, {'n_origins': 15, 'n_hubs': 6, 'n_destinations': 25},
+             {'n_origins': 20, 'n_hubs': 10, 'n_destinations': 60}, {'n_origins': 30, 'n_hubs': 15, 'n_destinations': 120},
+             {'n_origins': 40, 'n_hubs': 20, 'n_destinations': 250}],
+}
+
+
+def _write_input(model_name, size, seed, directory):
+    # Generate the instance and store it the way the model reads its real data
+    if model_name == 'hub':
+        from hub_cost import random_cost_matrix
+        path = os.path.join(directory, 'cost_matrix.xlsx')
+        random_cost_matrix(size['n_nodes'], size['n_hubs'], seed=seed).to_excel(path)
+        return path
+    if model_name == 'beef':
+        from beef_network import random_case
+        path = os.path.join(directory, 'input_transportation_case.xlsx')
+        with pd.ExcelWriter(path) as writer:
+            for sheet, table in random_case(size['n_origins'], size['n_hubs'], size['n_destinations'], seed=seed).items():
+                table.to_excel(writer, sheet_name=sheet, index=False)
+        return path
+    return None  # the Vision data lives in Python dicts, loading is generating
+
+
+def _phases(model_name, size, seed, path):
+    # Generator of (phase name, callable) pairs; each callable returns what the next phase needs
+    if model_name == 'hub':
+        from hub_cost import HubCosts, load_cost_matrix
+        from hub_model import build_model, extract_allocation
+        state = {}
+        yield 'load', lambda _: state.setdefault('costs', HubCosts(load_cost_matrix(path)))
+        yield 'build', lambda costs: build_model(costs, size['p'])
+        yield 'extract', lambda model: extract_allocation(model, state['costs'])
+    elif model_name == 'vision':
+        from vision_model import build_model, extract_plans, random_data
+        yield 'load', lambda _: random_data(size['n_plants'], size['n_products'], size['n_customers'], seed=seed)
+        yield 'build', lambda data: build_model(data=data)
+        yield 'extract', lambda model: extract_plans(model)
+    else:
+        from beef_network import build_model, extract_solution, load_case
+        state = {}
+        yield 'load', lambda _: state.setdefault('case', load_case(path))
+        yield 'build', lambda case: build_model(case)
+        yield 'extract', lambda model: extract_solution(model, state['case'])
+
+
+def run_instance(model_name, size, seed, solver, trace_memory):
+    """Run one instance through every phase; meant to be called in a fresh process."""
+    record = {'model': model_name, 'size': size, 'seed': seed, 'solver': solver}
+    seconds, peak_python_mb = {}, {}
+
+    def timed(phase, func, argument):
+        if trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        result = func(argument)
+        seconds[phase] = time.perf_counter() - start
+        if trace_memory:
+            peak_python_mb[phase] = tracemalloc.get_traced_memory()[1] / 1e6
+        return result
+
+    if trace_memory:
+        tracemalloc.start()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = _write_input(model_name, size, seed, directory)
+        phases = _phases(model_name, size, seed, path)
+
+        phase, load = next(phases)
+        data = timed(phase, load, None)
+        phase, build = next(phases)
+        model = timed(phase, build, data)
+        record['variables'] = model.nvariables()
+        record['constraints'] = model.nconstraints()
+
+        # Shell solvers write this file themselves on every solve
+        lp_path = os.path.join(directory, 'model.lp')
+        timed('write', lambda m: m.write(lp_path, io_options={'symbolic_solver_labels': False}), model)
+        record['lp_bytes'] = os.path.getsize(lp_path)
+
+        results = timed('solve', lambda m: pyo.SolverFactory(solver).solve(m), model)
+        record['termination'] = str(results.solver.termination_condition)
+        record['objective'] = pyo.value(model.obj, exception=False)
+
+        phase, extract = next(phases)
+        timed(phase, extract, model)
+
+    record['seconds'] = seconds
+    if trace_memory:
+        record['peak_python_mb'] = peak_python_mb
+        tracemalloc.stop()
+    if resource is not None:
+        # ru_maxrss is kilobytes on Linux and bytes on macOS
+        scale = 1e6 if sys.platform == 'darwin' else 1e3
+        record['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    return record
+
+
+def _in_fresh_process(*args):
+    # One process per instance so peak memory and imports do not carry over
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+        return pool.submit(run_instance, *args).result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--models', nargs='+', choices=list(LADDERS), default=list(LADDERS))
+    parser.add_argument('--steps', type=int, default=3, help='how many sizes of each ladder to run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--solver', default='cbc')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='add per-phase Python peak memory, measured in a separate run so timings stay clean')
+    parser.add_argument('--output', help='append one JSON line per instance to this file')
+    args = parser.parse_args(argv)
+
+    run = {'started': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+           'python': platform.python_version(), 'platform': platform.platform(), 'pyomo': pyomo_version}
+
+    print(f"{'model':<8}{'size':<48}{'vars':>9}{'cons':>9}{'load':>8}{'build':>8}{'write':>8}{'solve':>8}{'extract':>9}{'LP MB':>8}{'RSS MB':>8}")
+    for model_name in args.models:
+        for size in LADDERS[model_name][:args.steps]:
+            record = _in_fresh_process(model_name, size, args.seed, args.solver, False)
+            if args.tracemalloc:
+                record['peak_python_mb'] = _in_fresh_process(model_name, size, args.seed, args.solver, True)['peak_python_mb']
+            record['run'] = run
+
+            s = record['seconds']
+            label = ' '.join(f'{key}={value}' for key, value in size.items())
+            print(f"{model_name:<8}{label:<48}{record['variables']:>9,}{record['constraints']:>9,}"
+                  f"{s['load']:>8.2f}{s['build']:>8.2f}{s['write']:>8.2f}{s['solve']:>8.2f}{s['extract']:>9.2f}"
+                  f"{record['lp_bytes'] / 1e6:>8.2f}{record.get('peak_rss_mb', float('nan')):>8.0f}", flush=True)
+
+            if args.output:
+                with open(args.output, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Lightweight per-phase timing and counters for the model scripts, notebooks and the hub app.
+
+Phases are exclusive: time spent in a phase opened inside another one (a
+solve inside a sensitivity loop) is booked to the inner phase only, so the
+phase times add up to the instrumented run time.
+
+    timer = PhaseTimer('Code 1')
+    timer.start('build')
+    ...                                  # model construction
+    timer.stop()
+    timer.record_model(model)            # variable and constraint counts
+    timer.write_lp(model)                # LP file size
+    results = timer.solve(opt, model)    # solver time vs Pyomo overhead
+    print(timer.log_line())
+"""
+import json
+import numbers
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+def _reported_time(results):
+    # Solver-side seconds as reported in the results object, None when the interface does not report it
+    solver = results.solver
+    for field in ('wallclock_time', 'time', 'user_time'):
+        value = getattr(solver, field, None)
+        if isinstance(value, numbers.Number):
+            return float(value)
+    return None
+
+
+class PhaseTimer:
+    """Seconds per named phase plus run counters, reported as a table or a JSON log line."""
+
+    def __init__(self, run):
+        self.run = run
+        self.seconds = {}
+        self.counters = {}
+        self._open = []  # [phase, start, seconds of nested phases]
+
+    def start(self, phase):
+        self._open.append([phase, time.perf_counter(), 0.0])
+
+    def stop(self):
+        phase, start, nested = self._open.pop()
+        elapsed = time.perf_counter() - start
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + elapsed - nested
+        if self._open:
+            self._open[-1][2] += elapsed
+        return elapsed
+
+    @contextmanager
+    def phase(self, phase):
+        self.start(phase)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def count(self, **counters):
+        # Add to running counters, e.g. number of solves
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record(self, **counters):
+        # Set counters that describe a state, e.g. model size
+        self.counters.update(counters)
+
+    def record_model(self, model):
+        self.record(variables=model.nvariables(), constraints=model.nconstraints())
+
+    def write_lp(self, model):
+        # Size of the LP file a shell solver (GLPK, CBC) writes on every solve, booked as 'write'
+        with self.phase('write'), tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model.lp')
+            model.write(path, io_options={'symbolic_solver_labels': False})
+            self.record(lp_bytes=os.path.getsize(path))
+
+    def solve(self, opt, model, **kwargs):
+        """opt.solve(model, **kwargs) booked as 'solve'.
+
+        When the solver reports its own time, the rest of the call (writing
+        the problem, starting the solver, reading and loading the solution)
+        is counted as Pyomo overhead. For a SolverRace the winning solver is
+        recorded as race_winner.
+        """
+        self.start('solve')
+        try:
+            results = opt.solve(model, **kwargs)
+        finally:
+            elapsed = self.stop()
+        self.count(solves=1)
+        if getattr(opt, 'winner', None) is not None:
+            # A solver_race.SolverRace: which solver's result was used
+            self.record(race_winner=opt.winner)
+        solver_time = _reported_time(results)
+        if solver_time is not None:
+            self.count(solver_seconds=solver_time, overhead_seconds=max(elapsed - solver_time, 0.0))
+        return results
+
+    def table(self):
+        total = sum(self.seconds.values())
+        return pd.DataFrame({
+            'Phase': list(self.seconds),
+            'Seconds': list(self.seconds.values()),
+            'Share': [seconds / total if total else 0.0 for seconds in self.seconds.values()],
+        })
+
+    def log_line(self):
+        # One JSON object per run, easy to grep and to load with pd.read_json(lines=True)
+        return json.dumps({
+            'run': self.run,
+            'seconds': {phase: round(seconds, 6) for phase, seconds in self.seconds.items()},
+            'total_seconds': round(sum(self.seconds.values()), 6),
+            'counters': {name: round(value, 6) if isinstance(value, float) else value for name, value in self.counters.items()},
+        })
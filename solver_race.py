@@ -0,0 +1,247 @@
+"""Race the installed MIP solvers on one Pyomo model and keep the first proven optimum.
+
+SolverRace stands in for a SolverFactory object, so scripts, notebooks and
+PhaseTimer.solve use it unchanged:
+
+    opt = SolverRace(time_limit=60)      # glpk, cbc and appsi_highs, whichever are installed
+    results = timer.solve(opt, model)    # winner's results, solution loaded, race_winner counter set
+    print(opt.log_line())                # which solver won, and how far the others got
+
+Each solver runs in a forked child process on its own copy of the model. The
+first to prove optimality wins and the others are killed together with the
+solver executables they started. With a time limit every solver stops there
+and the best incumbent wins. Without fork (Windows) the solvers run one after
+another instead, stopping at the first proven optimum.
+"""
+import json
+import math
+import os
+import signal
+import time
+from contextlib import redirect_stdout
+from multiprocessing import get_all_start_methods, get_context
+from multiprocessing.connection import wait
+
+import pandas as pd
+import pyomo.environ as pyo
+
+# Solvers raced by default, and their order when they run one after another
+SOLVERS = ['glpk', 'cbc', 'appsi_highs']
+
+# Seconds a solver gets past the time limit to hand back its incumbent
+GRACE_SECONDS = 5.0
+
+
+def installed_solvers(candidates=SOLVERS):
+    # The candidates Pyomo can find on this machine
+    return [name for name in candidates if pyo.SolverFactory(name).available(exception_flag=False)]
+
+
+def single_solver(solver):
+    # The solver itself, or for 'race' the first installed one, for callers that solve many small models in turn
+    if solver != 'race':
+        return solver
+    installed = installed_solvers()
+    if not installed:
+        raise RuntimeError(f'No solver installed, none of {", ".join(SOLVERS)} was found')
+    return installed[0]
+
+
+def configure_solver(solver, time_limit=None, mip_gap=None):
+    # SolverFactory with a wall-clock limit (seconds) and relative MIP gap under each solver's own option names;
+    # other solvers are returned as they are when no limit is asked for
+    opt = pyo.SolverFactory(solver)
+    if solver == 'glpk':
+        if time_limit is not None:
+            opt.options['tmlim'] = max(1, math.ceil(time_limit))
+        if mip_gap is not None:
+            opt.options['mipgap'] = mip_gap
+    elif solver == 'cbc':
+        if time_limit is not None:
+            opt.options['sec'] = time_limit
+        if mip_gap is not None:
+            opt.options['ratioGap'] = mip_gap
+    elif solver == 'appsi_highs':
+        # HiGHS option names; the legacy interface would reset opt.config.time_limit on solve
+        if time_limit is not None:
+            opt.options['time_limit'] = time_limit
+        if mip_gap is not None:
+            opt.options['mip_rel_gap'] = mip_gap
+    elif time_limit is not None or mip_gap is not None:
+        raise ValueError(f"Limits are only set for 'glpk', 'cbc' and 'appsi_highs', not {solver!r}")
+    return opt
+
+
+def solve_logged(opt, solver, model, log_path=None):
+    # opt.solve without loading the solution; with log_path the solver's progress is written there as it runs
+    if log_path is None:
+        return opt.solve(model, load_solutions=False)
+    if solver == 'appsi_highs':
+        # HiGHS runs in this process and its captured console output only arrives at the end, so it writes the log itself
+        opt.options['log_file'] = log_path
+        return opt.solve(model, load_solutions=False)
+    # GLPK and CBC print their progress, which tee copies line by line into the log
+    with open(log_path, 'w', buffering=1) as log, redirect_stdout(log):
+        return opt.solve(model, tee=True, load_solutions=False)
+
+
+def _objective(model):
+    return next(model.component_data_objects(pyo.Objective, active=True))
+
+
+def _run(model, solver, time_limit, mip_gap, log_path):
+    # One solver's row of the race table, with the results object it returned (None after an error)
+    start = time.perf_counter()
+    row = {'Solver': solver, 'Termination': 'error', 'Objective': None, 'Seconds': None, 'results': None}
+    try:
+        results = solve_logged(configure_solver(solver, time_limit, mip_gap), solver, model, log_path)
+    except Exception as error:
+        row['Error'] = f'{type(error).__name__}: {error}'
+    else:
+        row['Termination'] = str(results.solver.termination_condition)
+        row['results'] = results
+        if len(results.solution):
+            # Symbol map kept, solve() loads the winner's results again
+            model.solutions.load_from(results, delete_symbol_map=False)
+            row['Objective'] = pyo.value(_objective(model))
+    row['Seconds'] = time.perf_counter() - start
+    return row
+
+
+def _racer(connection, model, solver, time_limit, mip_gap, log_path):
+    # Forked child: its own process group, so stopping it also stops the solver executable
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    row = _run(model, solver, time_limit, mip_gap, log_path)
+    if row['Objective'] is not None:
+        # Keyed by component name instead of this process's symbol map, so the parent's model can load it
+        model.solutions.store_to(row['results'])
+    connection.send(row)
+
+
+def _stop(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        # No process groups (Windows) or the child has not called setsid yet
+        process.terminate()
+    process.join(timeout=5)
+
+
+class SolverRace:
+    """Drop-in for a Pyomo solver that races several installed solvers on the same model.
+
+    `solvers` defaults to those of SOLVERS that are installed. `time_limit`
+    (seconds) and `mip_gap` are passed to every solver, and with
+    `log_directory` each one writes its progress log to <solver>.log there.
+    After solve(), `winner` names the solver whose results were returned and
+    `table` has one row per solver: Termination ('stopped' when the race was
+    decided without it), Objective, Seconds and Winner.
+    """
+
+    def __init__(self, solvers=None, time_limit=None, mip_gap=None, log_directory=None):
+        self.solvers = installed_solvers() if solvers is None else list(solvers)
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        self.log_directory = log_directory
+        self.winner = None
+        self.table = None
+
+    def available(self, exception_flag=False):
+        return bool(self.solvers)
+
+    def warm_start_capable(self):
+        # Every solver would need its own start file, races start cold
+        return False
+
+    def _log_path(self, solver):
+        return None if self.log_directory is None else os.path.join(self.log_directory, f'{solver}.log')
+
+    def _race(self, model):
+        # Rows in the order the solvers finished, stopping at the first proven optimum or the deadline
+        context = get_context('fork')
+        start = time.perf_counter()
+        deadline = None if self.time_limit is None else start + self.time_limit + GRACE_SECONDS
+        running = {}
+        for solver in self.solvers:
+            receive, send = context.Pipe(duplex=False)
+            process = context.Process(target=_racer, daemon=True,
+                                      args=(send, model, solver, self.time_limit, self.mip_gap, self._log_path(solver)))
+            process.start()
+            send.close()
+            running[receive] = (solver, process)
+
+        rows = []
+        try:
+            while running and not any(row['Termination'] == 'optimal' for row in rows):
+                timeout = None if deadline is None else max(deadline - time.perf_counter(), 0.0)
+                ready = wait(list(running), timeout)
+                if not ready:
+                    break
+                for connection in ready:
+                    solver, process = running.pop(connection)
+                    try:
+                        rows.append(connection.recv())
+                    except EOFError:
+                        rows.append({'Solver': solver, 'Termination': 'error', 'Objective': None, 'results': None,
+                                     'Seconds': time.perf_counter() - start, 'Error': f'exited with code {process.exitcode}'})
+                    process.join()
+        finally:
+            # The race is decided (or interrupted), the solvers still running are stopped
+            for solver, process in running.values():
+                _stop(process)
+                rows.append({'Solver': solver, 'Termination': 'stopped', 'Objective': None, 'results': None,
+                             'Seconds': time.perf_counter() - start})
+        return rows
+
+    def _one_by_one(self, model):
+        rows = []
+        for solver in self.solvers:
+            rows.append(_run(model, solver, self.time_limit, self.mip_gap, self._log_path(solver)))
+            if rows[-1]['Termination'] == 'optimal':
+                break
+        return rows
+
+    def solve(self, model, load_solutions=True, **kwargs):
+        """Race the solvers on `model` and return the winner's results.
+
+        The winner is the first solver to prove optimality, otherwise the one
+        with the best incumbent. With load_solutions=False the solution is
+        left in the results for model.solutions.load_from. Other keyword
+        arguments of a single-solver solve (tee, warmstart) are ignored.
+        """
+        if not self.solvers:
+            raise RuntimeError(f'No solver to race, none of {", ".join(SOLVERS)} is installed')
+        rows = self._race(model) if 'fork' in get_all_start_methods() else self._one_by_one(model)
+
+        optimal = [row for row in rows if row['Termination'] == 'optimal']
+        feasible = [row for row in rows if row['Objective'] is not None]
+        if optimal:
+            winner = optimal[0]
+        elif feasible:
+            better = max if _objective(model).sense == pyo.maximize else min
+            winner = better(feasible, key=lambda row: row['Objective'])
+        else:
+            # No solution anywhere: hand back an infeasible/limit status if some solver reported one
+            winner = next((row for row in rows if row['results'] is not None), None)
+        self.table = pd.DataFrame([{key: value for key, value in row.items() if key != 'results'} for row in rows])
+        self.table['Winner'] = [row is winner for row in rows]
+        if winner is None:
+            self.winner = None
+            raise RuntimeError('Every solver failed:\n' + self.table.to_string(index=False))
+
+        self.winner = winner['Solver']
+        results = winner['results']
+        if load_solutions and len(results.solution):
+            model.solutions.load_from(results)
+        return results
+
+    def log_line(self):
+        # The last race as one JSON object, next to PhaseTimer.log_line in the run log
+        rows = [] if self.table is None else self.table.to_dict('records')
+        return json.dumps({
+            'race': self.winner,
+            'solvers': [{'solver': row['Solver'], 'termination': row['Termination'],
+                         'objective': None if pd.isna(row['Objective']) else row['Objective'],
+                         'seconds': None if pd.isna(row['Seconds']) else round(row['Seconds'], 6)} for row in rows],
+        })